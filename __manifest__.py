@@ -10,17 +10,23 @@
     'author': "Afonso Carvalho",
     'website': "http://www.netcom-ma.com.br",
     'category': 'Academico',
-    'version': '14.0.1.0',
+    'version': '14.0.1.1',
     'depends': ['base', 'web', 'geracad_curso'],
-    'external_dependencies': {'python': ['Pillow']},
+    'external_dependencies': {'python': ['Pillow', 'reportlab', 'PyPDF2']},
     'data': [
         'security/geracad_certificados_security.xml',
         'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
+        'data/ir_actions_server_data.xml',
+        'wizard/geracad_certificados_importar_alunos_views.xml',
         'views/geracad_certificados_views.xml',
+        'views/geracad_certificados_lote_views.xml',
+        'views/geracad_certificados_metrica_views.xml',
         'views/res_partner_professor_inherit_view.xml',
         'reports/report_certificado_template.xml',
         'reports/report_lista_entrega_certificado_template.xml',
         'reports/report_actions.xml',
+        'views/ir_actions_report_views.xml',
         'views/certificado_verificar_templates.xml',
     ],
     'installable': True,
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark dos motores do certificado: QWeb + wkhtmltopdf x nativo (ReportLab).
+Roda dentro do shell do Odoo, num banco com o módulo instalado (nada é gravado: rollback no fim):
+
+    BENCH_ALUNOS=200 odoo-bin shell -d <banco> --no-http < benchmarks/bench_motor_pdf.py
+
+Usa os primeiros BENCH_ALUNOS alunos existentes (ou cria um curso sintético se não houver).
+O cache de anexos (attachment_use) é desligado durante a medição para que o QWeb gere de fato.
+A divisão em blocos paralelos é sempre desligada (geracad_render_bloco): as threads dos blocos usam
+cursores próprios, fazem commit (anexos e QR no banco real) e não veriam o anexo desligado, o motor
+escolhido nem os alunos sintéticos desta transação.
+"""
+
+import os
+import time
+
+
+def _preparar_alunos(env, quantidade):
+    Aluno = env['geracad.certificados.curso.aluno']
+    alunos = Aluno.search([], limit=quantidade)
+    if len(alunos) >= quantidade:
+        return alunos
+    instrutor = env['res.partner'].create({'name': 'Instrutor Benchmark', 'e_professor': True})
+    curso = env['geracad.certificados.curso'].create({
+        'name': 'Curso Benchmark',
+        'date_inicio': '2026-01-10',
+        'carga_horaria': 40,
+        'instrutor_id': instrutor.id,
+        'conteudo_programatico': '<p>%s</p>' % ('Conteúdo programático do benchmark. ' * 40),
+    })
+    Aluno.create([
+        {'curso_id': curso.id, 'nome_aluno': 'Aluno Benchmark %05d' % i, 'aluno_registro': '%011d' % i}
+        for i in range(quantidade - len(alunos))
+    ])
+    return Aluno.search([], limit=quantidade)
+
+
+def _medir(report, alunos, motor):
+    report.env['ir.config_parameter'].sudo().set_param('geracad_certificados.motor_pdf', motor)
+    inicio = time.perf_counter()
+    pdf, _fmt = report._render_qweb_pdf(alunos.ids)
+    duracao = time.perf_counter() - inicio
+    return duracao, len(pdf)
+
+
+def main(env):
+    quantidade = int(os.environ.get('BENCH_ALUNOS', '50'))
+    alunos = _preparar_alunos(env, quantidade)
+    report = env.ref('geracad_certificados.action_report_certificado').with_context(geracad_render_bloco=True)
+    report.attachment = False
+    print('%-8s %8s %12s %14s %12s' % ('motor', 'alunos', 'tempo (s)', 'cert./segundo', 'PDF (KiB)'))
+    for motor in ('qweb', 'nativo'):
+        duracao, tamanho = _medir(report, alunos, motor)
+        print('%-8s %8d %12.2f %14.1f %12.0f' % (
+            motor, len(alunos), duracao, len(alunos) / duracao if duracao else 0, tamanho / 1024.0,
+        ))
+    env.cr.rollback()
+
+
+main(env)  # noqa: F821 (env é definido pelo odoo-bin shell)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark da remoção de fundo das assinaturas: implementação antiga (getdata/putdata,
+pixel a pixel em Python) x implementação por bandas (tools/imagem.py).
+
+Não precisa do Odoo nem de banco; só do Pillow:
+
+    python3 benchmarks/bench_remover_fundo.py
+    python3 benchmarks/bench_remover_fundo.py --tamanhos 1 5 12 --repeticoes 3
+
+Para cada tamanho (em megapixels) gera uma assinatura sintética (traços escuros
+sobre papel claro com ruído, como um scan), mede as duas implementações e confere
+que as PNGs geradas são idênticas byte a byte.
+"""
+
+import argparse
+import importlib.util
+import io
+import os
+import statistics
+import time
+
+from PIL import Image
+
+from dados_sinteticos import gerar_assinatura
+
+RAIZ_MODULO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _carregar_imagem_tools():
+    """Importa tools/imagem.py pelo caminho (sem importar o addon, que depende do Odoo)."""
+    path = os.path.join(RAIZ_MODULO, 'tools', 'imagem.py')
+    spec = importlib.util.spec_from_file_location('geracad_certificados_imagem', path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def remover_fundo_antigo(raw, soma_limite=700):
+    """Cópia da implementação anterior de _image_white_to_transparent (referência)."""
+    img = Image.open(io.BytesIO(raw)).convert('RGBA')
+    new_data = []
+    for pixel in img.getdata():
+        if sum(pixel[:3]) > soma_limite:
+            new_data.append((255, 255, 255, 0))
+        else:
+            new_data.append(pixel)
+    img.putdata(new_data)
+    out = io.BytesIO()
+    img.save(out, format='PNG')
+    return out.getvalue()
+
+
+def medir(func, raw, repeticoes):
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = func(raw)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', nargs='+', type=float, default=[1, 5, 12], help='Tamanhos em megapixels')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    imagem = _carregar_imagem_tools()
+    print('%-8s %-12s %12s %12s %10s %s' % ('MP', 'dimensões', 'antigo (s)', 'novo (s)', 'ganho', 'PNG idêntica'))
+    for mp in args.tamanhos:
+        raw = gerar_assinatura(mp)
+        dim = '%dx%d' % Image.open(io.BytesIO(raw)).size
+        t_antigo, png_antigo = medir(remover_fundo_antigo, raw, args.repeticoes)
+        t_novo, png_novo = medir(imagem.remover_fundo_claro, raw, args.repeticoes)
+        print('%-8s %-12s %12.3f %12.3f %9.1fx %s' % (
+            mp, dim, t_antigo, t_novo, t_antigo / t_novo if t_novo else 0, png_antigo == png_novo,
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Geradores de dados sintéticos para os benchmarks (só Pillow, determinísticos pela seed):
+assinaturas como um scan (traços escuros sobre papel claro com ruído, em JPEG) e logos
+de empresa (PNG com transparência), além de nomes e registros de alunos.
+"""
+
+import io
+import random
+
+from PIL import Image, ImageDraw
+
+NOMES = ('ANA', 'BRUNO', 'CARLA', 'DANIEL', 'ELISA', 'FABIO', 'GABRIELA', 'HUGO', 'IARA', 'JOAO')
+SOBRENOMES = ('SILVA', 'SANTOS', 'OLIVEIRA', 'SOUZA', 'LIMA', 'PEREIRA', 'COSTA', 'CARVALHO', 'ALMEIDA')
+CATEGORIAS = ('A', 'B', 'AB', 'C', 'D', 'E')
+
+
+def gerar_assinatura(megapixels, seed=42):
+    """Gera JPEG de uma assinatura sintética com ~megapixels (proporção 4:3)."""
+    rnd = random.Random(seed)
+    largura = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    altura = int(megapixels * 1e6 / largura)
+    img = Image.effect_noise((largura, altura), 12).point(lambda v: min(255, 200 + v // 4)).convert('RGB')
+    draw = ImageDraw.Draw(img)
+    espessura = max(2, largura // 400)
+    for _ in range(12):
+        pontos = [(rnd.randint(0, largura), rnd.randint(altura // 4, 3 * altura // 4)) for _ in range(8)]
+        draw.line(pontos, fill=(rnd.randint(10, 60), rnd.randint(10, 60), rnd.randint(60, 120)), width=espessura)
+    out = io.BytesIO()
+    img.save(out, format='JPEG', quality=90)
+    return out.getvalue()
+
+
+def gerar_logo(largura=1200, altura=600, seed=7):
+    """Gera PNG RGBA de um logo sintético (formas coloridas sobre fundo transparente)."""
+    rnd = random.Random(seed)
+    img = Image.new('RGBA', (largura, altura), (255, 255, 255, 0))
+    draw = ImageDraw.Draw(img)
+    for _ in range(6):
+        x0, y0 = rnd.randint(0, largura // 2), rnd.randint(0, altura // 2)
+        x1, y1 = x0 + rnd.randint(largura // 8, largura // 2), y0 + rnd.randint(altura // 8, altura // 2)
+        cor = (rnd.randint(0, 255), rnd.randint(0, 255), rnd.randint(0, 255), 255)
+        if rnd.random() < 0.5:
+            draw.ellipse((x0, y0, x1, y1), fill=cor)
+        else:
+            draw.rectangle((x0, y0, x1, y1), fill=cor)
+    out = io.BytesIO()
+    img.save(out, format='PNG')
+    return out.getvalue()
+
+
+def gerar_alunos(quantidade, seed=1):
+    """Lista de dicts com nome_aluno, aluno_categoria, aluno_registro e aluno_renach."""
+    rnd = random.Random(seed)
+    alunos = []
+    for i in range(quantidade):
+        alunos.append({
+            'nome_aluno': '%s %s %s' % (rnd.choice(NOMES), rnd.choice(SOBRENOMES), rnd.choice(SOBRENOMES)),
+            'aluno_categoria': rnd.choice(CATEGORIAS),
+            'aluno_registro': '%011d' % rnd.randrange(10 ** 11),
+            'aluno_renach': 'MA%09d' % i,
+        })
+    return alunos
@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+"""
+Suíte de benchmark do pipeline do certificado, por etapa, com dados sintéticos.
+Roda dentro do shell do Odoo, num banco local com o módulo instalado (sem rede):
+
+    BENCH_CURSOS=5 BENCH_ALUNOS=40 BENCH_SAIDA=/tmp/bench.json \\
+        odoo-bin shell -d <banco> < benchmarks/suite.py
+
+Variáveis de ambiente:
+    BENCH_CURSOS      cursos sintéticos (padrão 3)
+    BENCH_ALUNOS      alunos por curso (padrão 20)
+    BENCH_AMOSTRA     alunos medidos nas etapas caras (HTML, PDF, verificação; padrão 20)
+    BENCH_MP          megapixels das assinaturas sintéticas (padrão 3)
+    BENCH_ETAPAS      etapas a medir, separadas por vírgula (padrão: todas)
+    BENCH_SAIDA       arquivo do resultado em JSON (padrão: imprime no stdout)
+    BENCH_SEED        seed dos dados sintéticos (padrão 42)
+
+Etapas: remover_fundo, assinatura_data_uri_fria, assinatura_data_uri_quente, qrcode_fria,
+qrcode_quente, estaticos_frio, estaticos_quente, qweb_html, conversao_pdf, pdf_curso,
+verificacao_fria, verificacao_quente, verificacao_304, verificacao_inexistente.
+Para cada etapa: amostras, p50/p90/p95/p99/máx. (ms), vazão (chamadas/s) e pico de memória
+Python (tracemalloc, numa execução extra fora da medição de tempo). O resultado traz também o
+pico de RSS do processo e dos filhos (wkhtmltopdf).
+
+Os dados sintéticos são commitados (a rota de verificação usa cursor próprio) e removidos no fim;
+as demais alterações da medição (parâmetros, QR gerados, relatório sem anexo) são desfeitas por rollback.
+"""
+
+import base64
+import importlib.util
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+
+import odoo
+from odoo.modules.module import get_module_path
+
+MODULO = 'geracad_certificados'
+TODAS_ETAPAS = (
+    'remover_fundo', 'assinatura_data_uri_fria', 'assinatura_data_uri_quente',
+    'qrcode_fria', 'qrcode_quente', 'estaticos_frio', 'estaticos_quente',
+    'qweb_html', 'conversao_pdf', 'pdf_curso',
+    'verificacao_fria', 'verificacao_quente', 'verificacao_304', 'verificacao_inexistente',
+)
+PERCENTIS = (50, 90, 95, 99)
+
+
+def _carregar_dados_sinteticos():
+    """Importa benchmarks/dados_sinteticos.py pelo caminho (o shell lê este script do stdin)."""
+    path = os.path.join(get_module_path(MODULO), 'benchmarks', 'dados_sinteticos.py')
+    spec = importlib.util.spec_from_file_location('geracad_bench_dados_sinteticos', path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _config():
+    etapas = os.environ.get('BENCH_ETAPAS')
+    return {
+        'cursos': int(os.environ.get('BENCH_CURSOS', '3')),
+        'alunos_por_curso': int(os.environ.get('BENCH_ALUNOS', '20')),
+        'amostra': int(os.environ.get('BENCH_AMOSTRA', '20')),
+        'megapixels_assinatura': float(os.environ.get('BENCH_MP', '3')),
+        'seed': int(os.environ.get('BENCH_SEED', '42')),
+        'etapas': [e.strip() for e in etapas.split(',') if e.strip()] if etapas else list(TODAS_ETAPAS),
+    }
+
+
+def _percentil(ordenados, p):
+    """Percentil por posto mais próximo (lista já ordenada)."""
+    if not ordenados:
+        return 0.0
+    k = max(0, min(len(ordenados) - 1, int(round(p / 100.0 * len(ordenados) + 0.5)) - 1))
+    return ordenados[k]
+
+
+def _medir(chamadas, itens_por_chamada=1):
+    """
+    Executa cada chamada (função sem argumentos) medindo o tempo; depois repete a primeira
+    sob tracemalloc para o pico de memória. Retorna o dict de estatísticas da etapa.
+    """
+    tempos = []
+    for chamada in chamadas:
+        inicio = time.perf_counter()
+        chamada()
+        tempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    try:
+        chamadas[0]()
+        _atual, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    ordenados = sorted(tempos)
+    total = sum(tempos)
+    stats = {
+        'amostras': len(tempos),
+        'itens_por_amostra': itens_por_chamada,
+        'total_s': round(total, 6),
+        'media_ms': round(total / len(tempos) * 1000, 3),
+        'max_ms': round(ordenados[-1] * 1000, 3),
+        'vazao_por_s': round(len(tempos) * itens_por_chamada / total, 2) if total else None,
+        'pico_memoria_kib': round(pico / 1024.0, 1),
+    }
+    for p in PERCENTIS:
+        stats['p%s_ms' % p] = round(_percentil(ordenados, p) * 1000, 3)
+    return stats
+
+
+class Suite(object):
+
+    def __init__(self, env, config):
+        self.env = env
+        self.config = config
+        self.sinteticos = _carregar_dados_sinteticos()
+        self.cursos = env['geracad.certificados.curso']
+        self.alunos = env['geracad.certificados.curso.aluno']
+        self.parceiros = env['res.partner']
+        self.assinaturas_raw = []
+        self.logo_original = None
+
+    # ------------------------------------------------------------------
+    # Dados sintéticos
+    # ------------------------------------------------------------------
+
+    def criar_dados(self):
+        env, cfg, sint = self.env, self.config, self.sinteticos
+        seed = cfg['seed']
+        for i in range(cfg['cursos']):
+            self.assinaturas_raw.append((
+                sint.gerar_assinatura(cfg['megapixels_assinatura'], seed=seed + 2 * i),
+                sint.gerar_assinatura(cfg['megapixels_assinatura'], seed=seed + 2 * i + 1),
+            ))
+        self.parceiros = env['res.partner'].create([
+            {'name': 'Instrutor Benchmark %02d' % i, 'e_professor': True}
+            for i in range(cfg['cursos'])
+        ] + [
+            {'name': 'Responsável Benchmark %02d' % i, 'e_professor': True}
+            for i in range(cfg['cursos'])
+        ])
+        n = cfg['cursos']
+        self.cursos = env['geracad.certificados.curso'].create([{
+            'name': 'Curso Benchmark %02d' % i,
+            'date_inicio': '2026-01-10',
+            'date_fim': '2026-01-20',
+            'carga_horaria': 40,
+            'instrutor_id': self.parceiros[i].id,
+            'responsavel_tecnico_id': self.parceiros[n + i].id,
+            'assinatura_instrutor': base64.b64encode(self.assinaturas_raw[i][0]),
+            'assinatura_responsavel_tecnico': base64.b64encode(self.assinaturas_raw[i][1]),
+            'conteudo_programatico': '<p>%s</p>' % ('Conteúdo programático do benchmark. ' * 40),
+        } for i in range(n)])
+        vals_list = []
+        for i, curso in enumerate(self.cursos):
+            for vals in sint.gerar_alunos(cfg['alunos_por_curso'], seed=seed + i):
+                vals['curso_id'] = curso.id
+                vals_list.append(vals)
+        # QR adiado: a etapa qrcode_fria mede a geração em get_qrcode_base64
+        self.alunos = env['geracad.certificados.curso.aluno'].with_context(
+            geracad_qrcode_adiado=True,
+        ).create(vals_list)
+        company = env.company
+        if not company.logo:
+            self.logo_original = False
+            company.logo = base64.b64encode(sint.gerar_logo(seed=seed))
+        env.cr.commit()
+
+    def remover_dados(self):
+        env = self.env
+        env.cr.rollback()
+        self.alunos.exists().unlink()
+        self.cursos.exists().unlink()
+        self.parceiros.exists().unlink()
+        if self.logo_original is not None:
+            env.company.logo = self.logo_original
+        env.cr.commit()
+
+    def amostra_alunos(self):
+        return self.alunos[:self.config['amostra']]
+
+    # ------------------------------------------------------------------
+    # Etapas
+    # ------------------------------------------------------------------
+
+    def etapa_remover_fundo(self):
+        curso = self.cursos[:1]
+        raws = [raw for par in self.assinaturas_raw for raw in par]
+        return _medir([lambda raw=raw: curso._image_white_to_transparent(raw) for raw in raws])
+
+    def etapa_assinatura_data_uri_fria(self):
+        from odoo.addons.geracad_certificados.models.geracad_certificados_curso import _CACHE_ASSINATURAS
+
+        curso = self.cursos[:1]
+        raws = [raw for par in self.assinaturas_raw for raw in par]
+
+        def chamada(raw):
+            _CACHE_ASSINATURAS.clear()
+            curso._assinatura_to_data_uri(raw)
+        return _medir([lambda raw=raw: chamada(raw) for raw in raws])
+
+    def etapa_assinatura_data_uri_quente(self):
+        curso = self.cursos[:1]
+        raws = [raw for par in self.assinaturas_raw for raw in par]
+        for raw in raws:
+            curso._assinatura_to_data_uri(raw)
+        return _medir([lambda raw=raw: curso._assinatura_to_data_uri(raw) for raw in raws * 10])
+
+    def etapa_qrcode_fria(self):
+        alunos = self.amostra_alunos()
+
+        def chamada(aluno):
+            aluno.qrcode_png = False
+            aluno.get_qrcode_base64()
+        return _medir([lambda a=a: chamada(a) for a in alunos])
+
+    def etapa_qrcode_quente(self):
+        alunos = self.amostra_alunos()
+        for aluno in alunos:
+            aluno.get_qrcode_base64()
+        return _medir([lambda a=a: a.get_qrcode_base64() for a in alunos])
+
+    def _estaticos(self):
+        aluno = self.alunos[:1]
+        aluno._get_certificado_fundo_data_uri()
+        aluno._get_canto_tl_data_uri()
+        aluno._get_selo_data_uri()
+        aluno.get_company_logo_data_uri()
+
+    def etapa_estaticos_frio(self):
+        from odoo.addons.geracad_certificados.tools import estaticos
+
+        def chamada():
+            estaticos.limpar_cache()
+            self._estaticos()
+        return _medir([chamada] * 10)
+
+    def etapa_estaticos_quente(self):
+        self._estaticos()
+        return _medir([self._estaticos] * 100)
+
+    def _report(self):
+        report = self.env.ref('geracad_certificados.action_report_certificado')
+        # Sem cache de anexos e sem divisão em threads (que não veriam a transação): desfeito no rollback
+        report.attachment = False
+        report.attachment_use = False
+        self.env['ir.config_parameter'].sudo().set_param('geracad_certificados.render_tamanho_bloco', '0')
+        self.env['ir.config_parameter'].sudo().set_param('geracad_certificados.motor_pdf', 'qweb')
+        return report
+
+    def etapa_qweb_html(self):
+        report = self._report()
+        return _medir([lambda a=a: report._render_qweb_html(a.ids) for a in self.amostra_alunos()])
+
+    def etapa_conversao_pdf(self):
+        """Só o wkhtmltopdf: o HTML de cada aluno é renderizado antes, fora da medição."""
+        report = self._report()
+        preparados = []
+        for aluno in self.amostra_alunos():
+            html = report._render_qweb_html(aluno.ids)[0]
+            bodies, _html_ids, header, footer, specific_paperformat_args = report._prepare_html(html)
+            preparados.append((bodies, header, footer, specific_paperformat_args))
+
+        def chamada(bodies, header, footer, specific_paperformat_args):
+            report._run_wkhtmltopdf(
+                bodies,
+                header=header,
+                footer=footer,
+                landscape=False,
+                specific_paperformat_args=specific_paperformat_args,
+                set_viewport_size=False,
+            )
+        return _medir([lambda p=p: chamada(*p) for p in preparados])
+
+    def etapa_pdf_curso(self):
+        """PDF completo (_render_qweb_pdf) de todos os alunos de cada curso numa única chamada."""
+        report = self._report()
+        return _medir(
+            [lambda c=c: report._render_qweb_pdf(c.aluno_ids.ids) for c in self.cursos],
+            itens_por_chamada=self.config['alunos_por_curso'],
+        )
+
+    def _cliente_http(self):
+        from werkzeug.test import Client
+        from werkzeug.wrappers import Response
+
+        # Sem servidor: as requisições vão direto para a aplicação WSGI do Odoo, no banco atual
+        odoo.tools.config['dbfilter'] = '^%s$' % self.env.cr.dbname
+        return Client(odoo.http.root, Response)
+
+    def _get(self, cliente, url, headers=None, status=200):
+        resposta = cliente.get(url, headers=headers or {})
+        if resposta.status_code != status:
+            raise RuntimeError('%s: HTTP %s (esperado %s)' % (url, resposta.status_code, status))
+        return resposta
+
+    def etapa_verificacao_fria(self):
+        cliente = self._cliente_http()
+        Aluno = self.env['geracad.certificados.curso.aluno']
+
+        def chamada(token):
+            Aluno._limpar_paginas_verificacao_cache()
+            self._get(cliente, '/certificados/verificar/%s' % token)
+        return _medir([lambda t=a.token: chamada(t) for a in self.amostra_alunos()])
+
+    def etapa_verificacao_quente(self):
+        cliente = self._cliente_http()
+        tokens = self.amostra_alunos().mapped('token')
+        for token in tokens:
+            self._get(cliente, '/certificados/verificar/%s' % token)
+        return _medir([lambda t=t: self._get(cliente, '/certificados/verificar/%s' % t) for t in tokens])
+
+    def etapa_verificacao_304(self):
+        cliente = self._cliente_http()
+        chamadas = []
+        for token in self.amostra_alunos().mapped('token'):
+            url = '/certificados/verificar/%s' % token
+            etag = self._get(cliente, url).headers['ETag']
+            chamadas.append(lambda url=url, etag=etag: self._get(cliente, url, {'If-None-Match': etag}, 304))
+        return _medir(chamadas)
+
+    def etapa_verificacao_inexistente(self):
+        import uuid
+
+        cliente = self._cliente_http()
+        tokens = [uuid.uuid4().hex for _i in range(self.config['amostra'])]
+        return _medir([
+            lambda t=t: self._get(cliente, '/certificados/verificar/%s' % t, status=404) for t in tokens
+        ])
+
+    # ------------------------------------------------------------------
+
+    def executar(self):
+        resultado = {
+            'ambiente': {
+                'python': sys.version.split()[0],
+                'odoo': odoo.release.version,
+                'plataforma': platform.platform(),
+                'cpus': os.cpu_count(),
+                'banco': self.env.cr.dbname,
+            },
+            'parametros': dict(self.config),
+            'etapas': {},
+        }
+        inicio = time.perf_counter()
+        self.criar_dados()
+        resultado['criacao_dados_s'] = round(time.perf_counter() - inicio, 3)
+        try:
+            for nome in self.config['etapas']:
+                metodo = getattr(self, 'etapa_%s' % nome, None)
+                if metodo is None:
+                    resultado['etapas'][nome] = {'erro': 'etapa desconhecida'}
+                    continue
+                try:
+                    resultado['etapas'][nome] = metodo()
+                except Exception as e:
+                    self.env.cr.rollback()
+                    resultado['etapas'][nome] = {'erro': '%s: %s' % (type(e).__name__, e)}
+        finally:
+            self.remover_dados()
+        resultado['pico_rss_kib'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        resultado['pico_rss_filhos_kib'] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        return resultado
+
+
+def main(env):
+    resultado = Suite(env, _config()).executar()
+    saida = json.dumps(resultado, indent=2, sort_keys=True, ensure_ascii=False)
+    path = os.environ.get('BENCH_SAIDA')
+    if path:
+        with open(path, 'w') as f:
+            f.write(saida)
+    else:
+        print(saida)
+
+
+main(env)  # noqa: F821 (env é definido pelo odoo-bin shell)
@@ -1,3 +1,4 @@
 # -*- coding: utf-8 -*-
 
+from . import lista_entrega
 from . import main
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Download da lista de entrega de certificados em formato tabular (usuários internos).
+Rota: GET /certificados/lista-entrega/<csv|xlsx>?ids=1,2,3 (cursos; acionada pelo menu Ação).
+As linhas são lidas numa consulta antes da resposta (o cursor não sobrevive ao streaming);
+o CSV é transmitido em blocos e o XLSX é montado em arquivo temporário e enviado aos poucos.
+"""
+
+import tempfile
+
+from werkzeug.wsgi import wrap_file
+
+from odoo import fields, http
+from odoo.http import Response, content_disposition, request
+
+from ..tools import lista_entrega
+
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+class ListaEntregaController(http.Controller):
+
+    @http.route(
+        '/certificados/lista-entrega/<string:formato>',
+        type='http',
+        auth='user',
+    )
+    def lista_entrega(self, formato, ids='', **kwargs):
+        """Lista de entrega (Nº, nome, categoria, registro, RENACH, token) dos cursos em `ids`."""
+        if formato not in FORMATOS:
+            return request.not_found()
+        try:
+            curso_ids = [int(i) for i in ids.split(',') if i]
+        except ValueError:
+            return request.not_found()
+        cursos = request.env['geracad.certificados.curso'].browse(curso_ids).exists()
+        if not cursos:
+            return request.not_found()
+        cursos.check_access_rights('read')
+        cursos.check_access_rule('read')
+        linhas = cursos._get_lista_entrega_linhas()
+        if len(cursos) == 1:
+            nome = 'Lista entrega - %s.%s' % (cursos.name, formato)
+        else:
+            nome = 'Listas de entrega - %s.%s' % (fields.Date.to_string(fields.Date.today()), formato)
+        headers = [
+            ('Content-Type', FORMATOS[formato]),
+            ('Content-Disposition', content_disposition(nome)),
+        ]
+        if formato == 'csv':
+            return Response(lista_entrega.csv_blocos(linhas), headers=headers, direct_passthrough=True)
+        arquivo = tempfile.TemporaryFile()
+        lista_entrega.gravar_xlsx(arquivo, linhas)
+        headers.append(('Content-Length', str(arquivo.tell())))
+        arquivo.seek(0)
+        return Response(
+            wrap_file(request.httprequest.environ, arquivo), headers=headers, direct_passthrough=True,
+        )
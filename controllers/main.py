@@ -1,79 +1,156 @@
 # -*- coding: utf-8 -*-
 """
 Controller de verificação de autenticidade do certificado via token (QR code).
-Rota pública: GET /certificados/verificar/<token>
+Rota pública: GET /certificados/verificar/<token> (e a curta /V/<token>, usada no QR dos tokens base32)
+A página de cada token é cacheada no worker e servida com ETag/Last-Modified/Cache-Control
+(304 quando o cliente ou proxy já tem a versão atual). O logo da empresa é servido por URL
+própria, versionada pelo hash do logo e reduzido ao tamanho exibido, em vez de data URI em cada página.
+Tokens com formato inválido recebem a página "não encontrado" (também cacheada) sem consulta ao banco;
+os ausentes do filtro de tokens (em memória) ainda são procurados pelos índices de token antes do 404,
+porque o filtro pode não ter os tokens criados ou trocados depois da sua montagem.
+QR assinado (?s=<carga>, ver tools/assinatura_qr.py): a carga é conferida primeiro, só com as
+chaves em memória; a válida é servida do cache do worker enquanto a página cacheada tiver menos que
+verificacao_max_age segundos, e a inválida (forjada, truncada) segue a verificação normal pelo token.
+
+Com a instrumentação ligada (parâmetro geracad_certificados.instrumentacao), as duas páginas
+registram a duração de cada etapa (filtro, busca, render) e o tamanho da resposta.
+
+API de verificação em lote (auditores), via POST:
+  /certificados/verificar/lote         -> JSON-RPC, params {"tokens": [...]}; limite api_lote_max
+  /certificados/verificar/lote.ndjson  -> um token por linha; uma linha JSON por token (listas grandes)
 """
 
+import json
+import time
+
+from werkzeug.http import http_date
+
 from odoo import http
-from odoo.http import request
-from werkzeug.utils import redirect
+from odoo.http import Response, request
+
+from ..tools import imagem, instrumentacao
+from ..tools.cache import CacheLRU
+
+# (banco, empresa) -> (versão dos dados da empresa, corpo HTML) da página "não encontrado"
+_CACHE_NAO_ENCONTRADO = CacheLRU(tamanho_max=64)
+
+MAX_AGE_PADRAO = 300
+# Limites de tokens por requisição da API em lote (parâmetros geracad_certificados.api_lote_max*)
+API_LOTE_MAX_PADRAO = 1000
+API_LOTE_MAX_NDJSON_PADRAO = 10000
 
 
 class CertificadoVerificarController(http.Controller):
     """Exibe página de validação do certificado quando o token existe."""
 
     def _get_company_data(self):
-        """Retorna dict com dados da empresa (nome, CNPJ, endereço, telefone, logo) para os templates."""
-        company = request.env.company.sudo()
-        partner = company.partner_id or company
-        endereco_partes = []
-        if getattr(partner, 'street', None):
-            endereco_partes.append(partner.street)
-        if getattr(partner, 'street2', None):
-            endereco_partes.append(partner.street2)
-        if getattr(partner, 'city', None):
-            cidade_uf = partner.city
-            if getattr(partner, 'state_id', None) and partner.state_id:
-                cidade_uf += ' - %s' % (partner.state_id.code or partner.state_id.name)
-            if getattr(partner, 'zip', None) and partner.zip:
-                cidade_uf += ' - CEP %s' % partner.zip
-            endereco_partes.append(cidade_uf)
-        if getattr(partner, 'country_id', None) and partner.country_id:
-            endereco_partes.append(partner.country_id.name)
-        endereco_completo = ', '.join(endereco_partes) if endereco_partes else ''
-        cnpj = company.vat or getattr(company, 'l10n_br_cnpj_cpf', None) or ''
-        if not cnpj and company.partner_id:
-            cnpj = company.partner_id.vat or getattr(company.partner_id, 'l10n_br_cnpj_cpf', None) or ''
-        company_logo_data_uri = ''
-        if company.logo:
-            logo = company.logo
-            if isinstance(logo, bytes):
-                logo = logo.decode('ascii')
-            company_logo_data_uri = 'data:image/png;base64,' + logo
-        return {
-            'company_nome': company.name,
-            'company_cnpj': cnpj,
-            'endereco_completo': endereco_completo,
-            'company_telefone': company.phone or getattr(company, 'mobile', None) or (company.partner_id and (company.partner_id.phone or company.partner_id.mobile)) or '',
-            'company_logo_data_uri': company_logo_data_uri,
-        }
+        """Retorna dict com dados da empresa (nome, CNPJ, endereço, telefone, URL do logo) para os templates."""
+        return request.env.company.sudo()._get_certificado_company_data()
+
+    def _get_max_age(self):
+        return int(request.env['ir.config_parameter'].sudo().get_param(
+            'geracad_certificados.verificacao_max_age', MAX_AGE_PADRAO,
+        ))
+
+    def _get_cache_headers(self, etag, last_modified=None):
+        headers = [
+            ('ETag', '"%s"' % etag),
+            ('Cache-Control', 'public, max-age=%s' % self._get_max_age()),
+        ]
+        if last_modified:
+            headers.append(('Last-Modified', http_date(last_modified)))
+        return headers
+
+    def _nao_modificado(self, etag, last_modified=None):
+        """True se o cliente já tem a versão atual (If-None-Match / If-Modified-Since)."""
+        httprequest = request.httprequest
+        if httprequest.if_none_match:
+            return httprequest.if_none_match.contains(etag)
+        if last_modified and httprequest.if_modified_since:
+            return last_modified.replace(microsecond=0) <= httprequest.if_modified_since.replace(tzinfo=None)
+        return False
+
+    def _instrumentar(self, operacao, func, *args, **kwargs):
+        """Executa a rota dentro de uma medição, se a instrumentação estiver ligada."""
+        Metrica = request.env['geracad.certificados.metrica'].sudo()
+        modo = Metrica._get_modo_instrumentacao()
+        if not modo:
+            return func(*args, **kwargs)
+        with instrumentacao.operacao(operacao) as medicao:
+            response = func(*args, **kwargs)
+            medicao.anotar(status=response.status_code, bytes=len(response.get_data() or b''))
+        Metrica._gravar(medicao, modo)
+        return response
 
     @http.route(
-        '/certificados/verificar/<string:token>',
+        ['/certificados/verificar/<string:token>', '/V/<string:token>'],
         type='http',
         auth='public',
         csrf=False,
     )
     def verificar_certificado(self, token, **kwargs):
         """
-        Busca geracad.certificados.curso.aluno pelo token.
-        Se existir: renderiza template com "Certificado válido" e dados.
-        Se não existir: retorna 404 com página "Não encontrado".
+        Busca geracad.certificados.curso.aluno pelo token (atual ou anterior a uma reemissão).
+        Se existir: renderiza template com "Certificado válido" e dados (ou 304 / página cacheada).
+        Se não existir (formato inválido ou sem registro): 404 com página "Não encontrado".
         """
+        return self._instrumentar('verificar_certificado', self._verificar_certificado, token, kwargs.get('s'))
+
+    def _verificar_certificado(self, token, assinatura=None):
         CertificadoCursoAluno = request.env['geracad.certificados.curso.aluno'].sudo()
-        linha = CertificadoCursoAluno.search([('token', '=', token)], limit=1)
+        assinatura_valida = None
+        if assinatura:
+            with instrumentacao.etapa('assinatura_qr'):
+                assinatura_valida = CertificadoCursoAluno._verificar_assinatura_qr(token, assinatura)
+        with instrumentacao.etapa('filtro_tokens'):
+            encontrado = CertificadoCursoAluno._token_no_filtro(token)
+        if not encontrado:
+            return self._render_nao_encontrado(status=404)
+        if assinatura_valida:
+            resposta = self._responder_assinado_cache(CertificadoCursoAluno._get_pagina_verificacao_cache(token))
+            if resposta is not None:
+                return resposta
+        with instrumentacao.etapa('busca'):
+            linha = CertificadoCursoAluno._buscar_por_token(token)
         if not linha:
-            return redirect('/certificados/nao-encontrado')
-        company_data = self._get_company_data()
-        return request.render(
-            'geracad_certificados.certificado_verificar_page',
-            {
-                'linha': linha,
-                'curso': linha.curso_id,
-                'nome_aluno': linha.nome_aluno,
-                **company_data,
-            },
-        )
+            return self._render_nao_encontrado(status=404)
+        with instrumentacao.etapa('etag'):
+            company_data = self._get_company_data()
+            etag = linha._get_verificacao_etag(company_data)
+            last_modified = linha._get_verificacao_last_modified()
+            headers = self._get_cache_headers(etag, last_modified)
+        if self._nao_modificado(etag, last_modified):
+            return Response(status=304, headers=headers)
+        cache = CertificadoCursoAluno._get_pagina_verificacao_cache(token)
+        if cache and cache[0] == etag:
+            corpo = cache[1]
+        else:
+            with instrumentacao.etapa('render') as etapa:
+                corpo = request.render(
+                    'geracad_certificados.certificado_verificar_page',
+                    linha._get_verificacao_valores(company_data),
+                    lazy=False,
+                ).data
+                etapa.bytes = len(corpo)
+        # Conferida no banco agora: renova o prazo do caminho rápido do QR assinado
+        CertificadoCursoAluno._set_pagina_verificacao_cache(token, (etag, corpo, last_modified, time.monotonic()))
+        return request.make_response(corpo, headers=[('Content-Type', 'text/html; charset=utf-8')] + headers)
+
+    def _responder_assinado_cache(self, cache):
+        """
+        Caminho rápido do QR assinado (carga já conferida): página cacheada no worker, sem banco,
+        se tiver menos que verificacao_max_age segundos (o mesmo prazo dado a proxies e navegadores).
+        Retorna None para seguir a verificação normal.
+        """
+        if not cache:
+            return None
+        etag, corpo, last_modified, momento = cache
+        if time.monotonic() - momento >= self._get_max_age():
+            return None
+        headers = self._get_cache_headers(etag, last_modified)
+        if self._nao_modificado(etag, last_modified):
+            return Response(status=304, headers=headers)
+        return request.make_response(corpo, headers=[('Content-Type', 'text/html; charset=utf-8')] + headers)
 
     @http.route(
         '/certificados/nao-encontrado',
@@ -83,8 +160,120 @@ class CertificadoVerificarController(http.Controller):
     )
     def certificado_nao_encontrado(self, **kwargs):
         """Página exibida quando o token do certificado não existe."""
+        return self._instrumentar('certificado_nao_encontrado', self._render_nao_encontrado)
+
+    def _render_nao_encontrado(self, status=200):
+        """Página "não encontrado", renderizada uma vez por empresa e versão dos dados da empresa."""
         company_data = self._get_company_data()
-        return request.render(
-            'geracad_certificados.certificado_nao_encontrado_page',
-            company_data,
-        )
+        chave = (request.db, request.env.company.id)
+        cache = _CACHE_NAO_ENCONTRADO.get(chave)
+        if cache and cache[0] == company_data['company_versao']:
+            corpo = cache[1]
+        else:
+            with instrumentacao.etapa('render') as etapa:
+                corpo = request.render(
+                    'geracad_certificados.certificado_nao_encontrado_page',
+                    company_data,
+                    lazy=False,
+                ).data
+                etapa.bytes = len(corpo)
+            _CACHE_NAO_ENCONTRADO.set(chave, (company_data['company_versao'], corpo))
+        response = request.make_response(corpo, headers=[('Content-Type', 'text/html; charset=utf-8')])
+        response.status_code = status
+        return response
+
+    @http.route(
+        '/certificados/logo/<int:company_id>',
+        type='http',
+        auth='public',
+        csrf=False,
+    )
+    def logo_empresa(self, company_id, **kwargs):
+        """Logo da empresa para as páginas de verificação; URL versionada (?v=hash), cacheável por 1 ano."""
+        company = request.env['res.company'].sudo().browse(company_id).exists()
+        if not company:
+            return request.not_found()
+        company_data = company._get_certificado_company_data()
+        if not company_data['company_logo_hash']:
+            return request.not_found()
+        largura_max, altura_max = imagem.LOGO_VERIFICACAO_MAX
+        etag = '%s-%s' % (company_data['company_logo_hash'], altura_max)
+        headers = [
+            ('ETag', '"%s"' % etag),
+            ('Cache-Control', 'public, max-age=31536000, immutable'),
+        ]
+        if request.httprequest.if_none_match.contains(etag):
+            return Response(status=304, headers=headers)
+        logo = company._get_logo_variante_png(largura_max, altura_max)
+        mimetype = 'image/jpeg' if logo[:2] == b'\xff\xd8' else 'image/png'
+        return request.make_response(logo, headers=[('Content-Type', mimetype)] + headers)
+
+    def _get_limite_lote(self, parametro, padrao):
+        return int(request.env['ir.config_parameter'].sudo().get_param(parametro, padrao))
+
+    @http.route(
+        '/certificados/verificar/lote',
+        type='json',
+        auth='public',
+        methods=['POST'],
+        csrf=False,
+    )
+    def verificar_certificados_lote(self, tokens=None, **kwargs):
+        """
+        Verifica vários tokens numa requisição (JSON-RPC: {"params": {"tokens": [...]}}).
+        Retorna {"total": n, "resultados": [...]} com um resultado por token, na ordem recebida.
+        """
+        if not isinstance(tokens, list) or not all(isinstance(t, str) for t in tokens):
+            return {'erro': 'Envie {"params": {"tokens": ["..."]}}.'}
+        limite = self._get_limite_lote('geracad_certificados.api_lote_max', API_LOTE_MAX_PADRAO)
+        if len(tokens) > limite:
+            return {'erro': 'Máximo de %s tokens por requisição.' % limite, 'limite': limite}
+        tokens = [t.strip() for t in tokens]
+        resultados = request.env['geracad.certificados.curso.aluno'].sudo()._verificar_tokens_lote(tokens)
+        return {'total': len(resultados), 'resultados': resultados}
+
+    @http.route(
+        '/certificados/verificar/lote.ndjson',
+        type='http',
+        auth='public',
+        methods=['POST'],
+        csrf=False,
+    )
+    def verificar_certificados_lote_ndjson(self, **kwargs):
+        """
+        Variante NDJSON para listas grandes: corpo com um token por linha (text/plain ou
+        application/x-ndjson, linhas podendo ser "token" ou {"token": "..."}); resposta com
+        uma linha JSON por token, na ordem. As consultas são feitas antes da resposta
+        (o cursor não sobrevive ao streaming); só a serialização é transmitida aos poucos.
+        O corpo é lido linha a linha, e a leitura para assim que o limite de tokens é excedido.
+        Token que não é texto ({"token": 5}, null) recebe status 'formato_invalido'.
+        """
+        limite = self._get_limite_lote('geracad_certificados.api_lote_max_ndjson', API_LOTE_MAX_NDJSON_PADRAO)
+        tokens = []
+        for linha in request.httprequest.stream:
+            linha = linha.decode('utf-8', 'replace').strip()
+            if not linha:
+                continue
+            if linha[0] in '{"':
+                try:
+                    valor = json.loads(linha)
+                except ValueError:
+                    valor = linha
+                linha = valor.get('token') if isinstance(valor, dict) else str(valor)
+            tokens.append(linha.strip() if isinstance(linha, str) else linha)
+            if len(tokens) > limite:
+                break
+        if len(tokens) > limite:
+            response = request.make_response(
+                json.dumps({'erro': 'Máximo de %s tokens por requisição.' % limite, 'limite': limite}),
+                headers=[('Content-Type', 'application/json; charset=utf-8')],
+            )
+            response.status_code = 413
+            return response
+        resultados = request.env['geracad.certificados.curso.aluno'].sudo()._verificar_tokens_lote(tokens)
+
+        def linhas():
+            for resultado in resultados:
+                yield (json.dumps(resultado, ensure_ascii=False) + '\n').encode('utf-8')
+
+        return Response(linhas(), headers=[('Content-Type', 'application/x-ndjson; charset=utf-8')])
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""
+14.0.1.1: formato de token compacto (base32) e coluna token_anterior.
+Se o parâmetro geracad_certificados.token_formato já estiver como 'base32' na atualização,
+os tokens uuid são reemitidos em massa; os antigos ficam em token_anterior e continuam verificáveis.
+Sem o parâmetro nada muda; a reemissão pode ser feita depois pelo shell (_reemitir_tokens).
+"""
+
+import logging
+
+from odoo import SUPERUSER_ID, api
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    Aluno = env['geracad.certificados.curso.aluno']
+    if Aluno._get_token_formato() != 'base32':
+        return
+    total = Aluno._reemitir_tokens(formato='base32')
+    _logger.info('geracad_certificados: %s tokens reemitidos no formato base32', total)
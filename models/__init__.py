@@ -2,4 +2,11 @@
 
 from . import geracad_certificados_curso
 from . import geracad_certificados_curso_aluno
+from . import geracad_certificados_lote
+from . import geracad_certificados_metrica
+from . import ir_config_parameter
+from . import res_company
 from . import res_partner
+from . import report_certificado
+from . import report_lista_entrega
+from . import ir_actions_report
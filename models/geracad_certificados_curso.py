@@ -5,12 +5,27 @@ Campos: nome, data início/fim (período), carga horária, instrutor (res.partne
 conteúdo programático (HTML), alunos (One2many).
 Ao enviar assinatura pelo formulário, o fundo claro é removido (PIL: soma R+G+B > 700)
 e a imagem é gravada em PNG; o relatório usa esse valor diretamente.
+A lista de entrega pode ser baixada em CSV/XLSX (controllers/lista_entrega.py) além do PDF.
 """
 
 import base64
-import io
+import binascii
+import hashlib
 
-from odoo import api, fields, models
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+from odoo.tools import str2bool
+from odoo.tools.image import image_data_uri
+
+from ..tools import imagem, instrumentacao
+from ..tools.cache import CacheLRU
+
+# Assinaturas processadas (data URI) por hash dos bytes + soma_limite; compartilhado no worker
+# Limitado também pelo tamanho total dos data URIs (assinaturas grandes não crescem o worker sem limite)
+_CACHE_ASSINATURAS = CacheLRU(tamanho_max=128, bytes_max=16 * 1024 * 1024)
+_CONTADORES_ANEXO = {'acertos': 0, 'faltas': 0}
+_NOME_ANEXO_ASSINATURA = 'geracad_assinatura_%s.png'
+CAMPOS_ASSINATURA = ('assinatura_instrutor', 'assinatura_responsavel_tecnico')
 
 
 class GeracadCertificadosCurso(models.Model):
@@ -84,6 +99,16 @@ class GeracadCertificadosCurso(models.Model):
         string='Alunos',
         help='Linhas de aluno por curso; cada uma gera um certificado com token único.',
     )
+    lote_ids = fields.One2many(
+        'geracad.certificados.lote',
+        'curso_id',
+        string='Lotes de emissão',
+    )
+    lote_count = fields.Integer(string='Lotes', compute='_compute_lote_count')
+
+    def _compute_lote_count(self):
+        for curso in self:
+            curso.lote_count = len(curso.lote_ids)
 
     def get_periodo_display(self):
         """
@@ -148,34 +173,35 @@ class GeracadCertificadosCurso(models.Model):
         #     partner = self.env['res.partner'].browse(vals['responsavel_tecnico_id'])
         #     if partner and getattr(partner, 'assinatura_professor', None):
         #         vals.setdefault('assinatura_responsavel_tecnico', partner.assinatura_professor)
-        for field in ('assinatura_instrutor', 'assinatura_responsavel_tecnico'):
+        for field in CAMPOS_ASSINATURA:
             if vals.get(field):
                 processed = self._processar_imagem_assinatura_para_png(vals[field])
                 if processed:
                     vals[field] = processed
+        if any(field in vals for field in CAMPOS_ASSINATURA):
+            self._limpar_cache_assinatura_anexo()
         return super().write(vals)
 
     def _processar_imagem_assinatura_para_png(self, image_binary):
         """
         Remove o fundo (rembg ou PIL soma>700) e converte para PNG.
         Retorna a string base64 para gravar no campo Binary (ou None para manter o valor).
+        Grava em resolução original; a variante reduzida é calculada (e cacheada) na impressão.
         """
         if not image_binary:
             return None
-        uri = self._assinatura_to_data_uri(image_binary)
-        if not uri or not uri.startswith('data:'):
-            return None
-        idx = uri.find('base64,')
-        if idx >= 0:
-            return uri[idx + 7:]
-        return None
+        return self._image_white_to_transparent(image_binary) or None
 
     def _binary_to_bytes(self, image_binary):
         """Converte valor do campo Binary (base64 ou bytes ou data URI) em bytes."""
         if not image_binary:
             return None
         if isinstance(image_binary, bytes):
-            return image_binary
+            # Valor lido de campo Binary vem em base64 (bytes); imagem crua não é base64 válido
+            try:
+                return base64.b64decode(image_binary, validate=True)
+            except (binascii.Error, ValueError):
+                return image_binary
         s = image_binary if isinstance(image_binary, str) else str(image_binary)
         if s.startswith('data:'):
             # data:image/png;base64,XXXX
@@ -184,11 +210,11 @@ class GeracadCertificadosCurso(models.Model):
                 s = s[idx + 7:]
         return base64.b64decode(s) if s else None
 
-    def _image_white_to_transparent(self, image_binary, soma_limite=700):
+    def _image_white_to_transparent(self, image_binary, soma_limite=imagem.SOMA_LIMITE_PADRAO):
         """
         Remove o fundo claro da imagem (lógica do test_remover_fundo_pil.py).
         Pixels com soma R+G+B > soma_limite viram transparentes; saída em PNG.
-        Aceita PNG, JPEG ou JPG.
+        Aceita PNG, JPEG ou JPG. A máscara é calculada por bandas (ver tools/imagem.py).
         :param image_binary: bytes, base64 ou data URI
         :param soma_limite: pixels com R+G+B > soma_limite viram transparentes (default 700)
         :return: string base64 da PNG, ou None em caso de erro / imagem inválida
@@ -197,51 +223,153 @@ class GeracadCertificadosCurso(models.Model):
         if not raw:
             return None
         try:
-            from PIL import Image
-            img = Image.open(io.BytesIO(raw)).convert('RGBA')
-            pixels = img.getdata()
-            new_data = []
-            for pixel in pixels:
-                # Fundo claro (soma R+G+B > 700) -> transparente; senão mantém o pixel
-                if sum(pixel[:3]) > 700:  # fundo claro
-                    new_data.append((255, 255, 255, 0))  # transparente
-                else:
-                    new_data.append(pixel)
-            img.putdata(new_data)
-            out = io.BytesIO()
-            img.save(out, format='PNG')
-            return base64.b64encode(out.getvalue()).decode('ascii')
+            png = imagem.remover_fundo_claro(raw, soma_limite)
+            return base64.b64encode(png).decode('ascii')
         except Exception:
             return None
 
-    def _assinatura_to_data_uri(self, image_binary):
+    @instrumentacao.medir_etapa('assinatura')
+    def _assinatura_to_data_uri(self, image_binary, soma_limite=imagem.SOMA_LIMITE_PADRAO):
         """
-        Retorna data URI da assinatura com fundo removido (PIL: soma R+G+B > 700 → transparente).
+        Retorna data URI da assinatura com fundo removido (PIL: soma R+G+B > 700 → transparente),
+        reduzida ao tamanho de exibição no certificado (imagem.ASSINATURA_MAX) e com paleta reduzida.
         Se o processamento falhar, retorna a imagem original.
+        O resultado é cacheado por hash dos bytes + soma_limite + variante (LRU do worker e, se ativado
+        pelo parâmetro geracad_certificados.cache_assinatura_anexo, em ir.attachment).
         """
         raw_bytes = self._binary_to_bytes(image_binary)
         if not raw_bytes:
             return ''
-        # PIL: fundo claro (soma > 700) → transparente; saída PNG
-        b64 = self._image_white_to_transparent(image_binary)
+        chave = '%s-%s-%s' % (hashlib.sha1(raw_bytes).hexdigest(), soma_limite, imagem.VERSAO_VARIANTES)
+        uri = _CACHE_ASSINATURAS.get(chave)
+        if uri is not None:
+            return uri
+        uri = self._cache_assinatura_anexo_get(chave)
+        if not uri:
+            uri = self._assinatura_processar_data_uri(raw_bytes, soma_limite)
+            self._cache_assinatura_anexo_set(chave, uri)
+        _CACHE_ASSINATURAS.set(chave, uri)
+        return uri
+
+    @instrumentacao.medir_etapa('assinatura_processamento')
+    def _assinatura_processar_data_uri(self, raw_bytes, soma_limite):
+        """Remove o fundo, reduz ao tamanho de exibição e monta o data URI (sem cache)."""
+        # PIL: fundo claro (soma > soma_limite) → transparente; saída PNG
+        b64 = self._image_white_to_transparent(raw_bytes, soma_limite)
         if b64:
-            return 'data:image/png;base64,%s' % b64
+            png = self._reduzir_assinatura_png(base64.b64decode(b64))
+            return 'data:image/png;base64,%s' % base64.b64encode(png).decode('ascii')
         # Imagem original (ex.: JPEG)
         b64 = base64.b64encode(raw_bytes).decode('ascii')
         mime = 'image/jpeg' if raw_bytes[:2] == b'\xff\xd8' else 'image/png'
         return 'data:%s;base64,%s' % (mime, b64)
 
-    def get_assinatura_instrutor_data_uri(self):
+    def _reduzir_assinatura_png(self, png):
+        """Variante da assinatura no tamanho do certificado (~2x 110px de altura), com paleta de cores."""
+        largura_max, altura_max = imagem.ASSINATURA_MAX
+        try:
+            return imagem.variante_png(png, largura_max, altura_max, imagem.CORES_ASSINATURA)
+        except Exception:
+            return png
+
+    def _cache_assinatura_anexo_ativo(self):
+        """Camada persistente (ir.attachment) do cache de assinaturas, desligada por padrão."""
+        valor = self.env['ir.config_parameter'].sudo().get_param('geracad_certificados.cache_assinatura_anexo')
+        return str2bool(valor or 'False')
+
+    def _cache_assinatura_anexo_get(self, chave):
         """
-        Retorna data URI da assinatura do instrutor para o certificado.
-        Ordem: assinatura do curso > assinatura do professor em res.partner > image_1920.
+        Busca a assinatura processada gravada em ir.attachment (em qualquer curso: a chave é o hash
+        do conteúdo); retorna data URI ou ''.
+        """
+        if not self._cache_assinatura_anexo_ativo():
+            return ''
+        anexo = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('name', '=', _NOME_ANEXO_ASSINATURA % chave),
+        ], order='id', limit=1)
+        if not anexo or not anexo.datas:
+            _CONTADORES_ANEXO['faltas'] += 1
+            return ''
+        _CONTADORES_ANEXO['acertos'] += 1
+        return 'data:image/png;base64,%s' % anexo.datas.decode('ascii')
+
+    def _cache_assinatura_anexo_set(self, chave, uri):
         """
+        Grava em ir.attachment apenas as PNGs processadas com sucesso, anexadas ao curso (removidas
+        com ele ou quando as assinaturas do curso mudam, ver _limpar_cache_assinatura_anexo).
+        Um lock consultivo por chave evita que duas impressões simultâneas gravem a mesma assinatura:
+        quem não obtém o lock não grava (a outra transação já está gravando).
+        """
+        prefixo = 'data:image/png;base64,'
+        if len(self) != 1 or not uri.startswith(prefixo) or not self._cache_assinatura_anexo_ativo():
+            return
+        nome = _NOME_ANEXO_ASSINATURA % chave
+        self.env.cr.execute(
+            'SELECT pg_try_advisory_xact_lock(%s)', (int(hashlib.sha1(nome.encode()).hexdigest()[:15], 16),),
+        )
+        if not self.env.cr.fetchone()[0]:
+            return
+        Attachment = self.env['ir.attachment'].sudo()
+        if Attachment.search_count([('res_model', '=', self._name), ('name', '=', nome)]):
+            return
+        Attachment.create({
+            'name': nome,
+            'res_model': self._name,
+            'res_id': self.id,
+            'type': 'binary',
+            'datas': uri[len(prefixo):],
+            'mimetype': 'image/png',
+        })
+
+    def _limpar_cache_assinatura_anexo(self):
+        """Remove as assinaturas processadas anexadas aos cursos (as assinaturas deles mudaram)."""
+        if not self.ids:
+            return
+        self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_id', 'in', self.ids),
+            ('name', '=like', _NOME_ANEXO_ASSINATURA % '%'),
+        ]).unlink()
+
+    @api.model
+    def get_cache_assinaturas_stats(self):
+        """Contadores do cache de assinaturas (memória do worker atual e camada ir.attachment)."""
+        stats = _CACHE_ASSINATURAS.stats()
+        stats.update({
+            'anexo_ativo': self._cache_assinatura_anexo_ativo(),
+            'anexo_acertos': _CONTADORES_ANEXO['acertos'],
+            'anexo_faltas': _CONTADORES_ANEXO['faltas'],
+        })
+        return stats
+
+    def _get_assinatura_instrutor_raw(self):
+        """Valor bruto da assinatura do instrutor: curso > assinatura do professor > image_1920."""
         self.ensure_one()
-        raw = (
+        return (
             self.assinatura_instrutor
             or (self.instrutor_id and getattr(self.instrutor_id, 'assinatura_professor', None))
             or (self.instrutor_id and self.instrutor_id.image_1920)
         )
+
+    def _get_assinatura_responsavel_tecnico_raw(self):
+        """Valor bruto da assinatura do responsável técnico: curso > assinatura do professor > image_1920."""
+        self.ensure_one()
+        if not self.responsavel_tecnico_id:
+            return None
+        return (
+            self.assinatura_responsavel_tecnico
+            or getattr(self.responsavel_tecnico_id, 'assinatura_professor', None)
+            or self.responsavel_tecnico_id.image_1920
+        )
+
+    def get_assinatura_instrutor_data_uri(self):
+        """
+        Retorna data URI da assinatura do instrutor para o certificado.
+        Ordem: assinatura do curso > assinatura do professor em res.partner > image_1920.
+        """
+        self.ensure_one()
+        raw = self._get_assinatura_instrutor_raw()
         if not raw:
             return ''
         return self._assinatura_to_data_uri(raw)
@@ -252,13 +380,153 @@ class GeracadCertificadosCurso(models.Model):
         Ordem: assinatura do curso > assinatura do professor em res.partner > image_1920.
         """
         self.ensure_one()
-        if not self.responsavel_tecnico_id:
-            return ''
-        raw = (
-            self.assinatura_responsavel_tecnico
-            or getattr(self.responsavel_tecnico_id, 'assinatura_professor', None)
-            or self.responsavel_tecnico_id.image_1920
-        )
+        raw = self._get_assinatura_responsavel_tecnico_raw()
         if not raw:
             return ''
         return self._assinatura_to_data_uri(raw)
+
+    def _assinatura_ou_foto_data_uri(self, assinatura, foto):
+        """
+        Imagem de um bloco de assinatura do certificado: a assinatura do curso (fundo removido e
+        reduzida, ver _assinatura_to_data_uri) ou, sem ela, a foto do parceiro como está (image_512).
+        """
+        self.ensure_one()
+        if assinatura:
+            return self._assinatura_to_data_uri(assinatura)
+        return image_data_uri(foto) if foto else ''
+
+    @instrumentacao.medir_etapa('contexto_curso')
+    def _get_certificado_contexto(self):
+        """
+        Valores do certificado que dependem só do curso (assinaturas, período, verso).
+        Calculado uma vez por curso em report.geracad_certificados.report_certificado_template
+        e compartilhado por todos os alunos impressos no mesmo lote.
+        Imagens das assinaturas (mesma ordem do template original):
+        instrutor = assinatura do instrutor no curso > foto do instrutor;
+        responsável = assinatura do responsável no curso > foto do responsável;
+        mesma pessoa = assinatura do instrutor > assinatura do responsável > foto do instrutor.
+        """
+        self.ensure_one()
+        mesmo_instrutor_resp = bool(
+            self.instrutor_id and self.responsavel_tecnico_id
+            and self.instrutor_id.id == self.responsavel_tecnico_id.id
+        )
+        foto_instrutor = self.instrutor_id.image_512
+        return {
+            'mesmo_instrutor_resp': mesmo_instrutor_resp,
+            'assinatura_instrutor_uri': self._assinatura_ou_foto_data_uri(self.assinatura_instrutor, foto_instrutor),
+            'assinatura_responsavel_tecnico_uri': self._assinatura_ou_foto_data_uri(
+                self.assinatura_responsavel_tecnico, self.responsavel_tecnico_id.image_512,
+            ) if self.responsavel_tecnico_id else '',
+            'assinatura_unica_uri': self._assinatura_ou_foto_data_uri(
+                self.assinatura_instrutor or self.assinatura_responsavel_tecnico, foto_instrutor,
+            ) if mesmo_instrutor_resp else '',
+            'periodo': self.get_periodo_display(),
+            'conteudo_programatico': self.conteudo_programatico,
+        }
+
+    def action_gerar_todos_certificados(self):
+        """
+        Cria um lote com todos os alunos do curso e agenda a geração em segundo plano (cron).
+        Abre o lote para acompanhar o progresso e baixar o ZIP ao final.
+        """
+        self.ensure_one()
+        if not self.aluno_ids:
+            raise UserError(_('O curso não possui alunos para gerar certificados.'))
+        lote = self.env['geracad.certificados.lote'].create({
+            'name': '%s - %s' % (self.name, fields.Datetime.to_string(fields.Datetime.now())),
+            'curso_id': self.id,
+            'linha_ids': [(0, 0, {'aluno_id': aluno.id}) for aluno in self.aluno_ids],
+        })
+        lote._agendar_processamento()
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'geracad.certificados.lote',
+            'res_id': lote.id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
+
+    def action_ver_lotes(self):
+        """Abre os lotes de emissão do curso."""
+        self.ensure_one()
+        action = self.env.ref('geracad_certificados.action_geracad_certificados_lote').read()[0]
+        action['domain'] = [('curso_id', '=', self.id)]
+        action['context'] = {'default_curso_id': self.id}
+        return action
+
+    def _get_lista_entrega_linhas(self):
+        """
+        Linhas da lista de entrega dos cursos (na ordem de self, alunos por id), como tuplas na ordem
+        de tools/lista_entrega.CABECALHO. Uma única consulta para todos os cursos.
+        """
+        por_curso = self._get_lista_entrega_linhas_por_curso()
+        return [linha for curso in self for linha in por_curso[curso.id]]
+
+    def _get_lista_entrega_linhas_por_curso(self):
+        """Mesmas linhas de _get_lista_entrega_linhas, agrupadas: {curso_id: [tuplas]}."""
+        alunos_por_curso = {curso.id: [] for curso in self}
+        alunos = self.env['geracad.certificados.curso.aluno'].search_read(
+            [('curso_id', 'in', self.ids)],
+            ['curso_id', 'nome_aluno', 'aluno_categoria', 'aluno_registro', 'aluno_renach', 'token'],
+            order='curso_id, id',
+        )
+        for aluno in alunos:
+            alunos_por_curso[aluno['curso_id'][0]].append(aluno)
+        por_curso = {}
+        for curso in self:
+            nome, periodo = curso.name, curso.get_periodo_display()
+            por_curso[curso.id] = [
+                (
+                    nome,
+                    periodo,
+                    numero,
+                    aluno['nome_aluno'],
+                    aluno['aluno_categoria'] or '',
+                    aluno['aluno_registro'] or '',
+                    aluno['aluno_renach'] or '',
+                    aluno['token'] or '',
+                )
+                for numero, aluno in enumerate(alunos_por_curso[curso.id], 1)
+            ]
+        return por_curso
+
+    def action_exportar_lista_entrega(self, formato='csv'):
+        """Ação (menu Ação da lista de cursos): baixa a lista de entrega dos cursos selecionados em CSV ou XLSX."""
+        if not self:
+            raise UserError(_('Selecione ao menos um curso.'))
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/certificados/lista-entrega/%s?ids=%s' % (formato, ','.join(str(i) for i in self.ids)),
+            'target': 'self',
+        }
+
+    def _hash_binario(self, image_binary):
+        """sha1 dos bytes de um valor Binary (ou '' se vazio); usado na impressão digital do certificado."""
+        raw = self._binary_to_bytes(image_binary)
+        return hashlib.sha1(raw).hexdigest() if raw else ''
+
+    def _get_certificado_fingerprint_dados(self):
+        """Tudo do curso que altera o PDF do certificado (ver get_certificado_fingerprint do aluno)."""
+        self.ensure_one()
+        return [
+            self.id,
+            self.name,
+            self.date_inicio,
+            self.date_fim,
+            self.carga_horaria,
+            self.instrutor_id.id,
+            self.instrutor_id.name,
+            self.instrutor_cargo_funcao,
+            self.instrutor_registro,
+            self.instrutor_renach,
+            self.responsavel_tecnico_id.id,
+            self.responsavel_tecnico_id.name,
+            self.responsavel_tecnico_cargo_funcao,
+            self.responsavel_tecnico_crea,
+            self.conteudo_programatico,
+            self._hash_binario(self.assinatura_instrutor),
+            self._hash_binario(self.assinatura_responsavel_tecnico),
+            self._hash_binario(self.instrutor_id.image_512),
+            self._hash_binario(self.responsavel_tecnico_id.image_512),
+        ]
@@ -3,13 +3,42 @@
 Modelo geracad.certificados.curso.aluno: nome do aluno e token por certificado.
 Sem vínculo com res.partner nem com a tabela de alunos do geracad_curso.
 Apenas: curso (relação com o curso), nome do aluno (Char) e token (único).
+Opcionalmente (geracad_certificados.qr_assinado), a URL do QR leva uma carga assinada com HMAC
+(tools/assinatura_qr.py) que a verificação confere sem consultar o banco.
+As páginas de verificação podem ser exportadas como arquivos estáticos para o nginx
+(geracad_certificados.exportacao_dir, ver tools/exportacao_estatica.py).
+Tokens novos seguem geracad_certificados.token_formato ('uuid' ou 'base32', ver tools/filtro_tokens.py);
+_reemitir_tokens troca os tokens em massa e guarda o anterior em token_anterior, que continua verificável.
 """
 
 import base64
+import hashlib
+import json
+import logging
 import os
-import uuid
+import secrets
+import time
 
-from odoo import api, fields, models
+from odoo import api, fields, models, tools
+
+from ..tools import assinatura_qr, estaticos, exportacao_estatica, filtro_tokens, fontes, imagem, instrumentacao, qr
+from ..tools.cache import CacheLRU
+from ..tools.filtro_tokens import FiltroTokens
+
+_logger = logging.getLogger(__name__)
+
+# SVG do QR (opção geracad_certificados.qrcode_formato = svg) por URL
+_CACHE_QRCODE_SVG = CacheLRU(tamanho_max=1024)
+
+# (banco, token) -> (etag, corpo HTML, last_modified, monotonic da renderização) da página de verificação
+_CACHE_PAGINAS_VERIFICACAO = CacheLRU(tamanho_max=2048)
+
+# Filtro de tokens por banco: banco -> (maior id dos alunos na montagem, FiltroTokens, monotonic da última conferência)
+_CACHE_FILTRO_TOKENS = CacheLRU(tamanho_max=16)
+INTERVALO_VERSAO_TOKENS = 2
+
+# Chaves HMAC do QR assinado: um parâmetro por chave (geracad_certificados.qr_chave.<kid>)
+PREFIXO_CHAVE_QR = 'geracad_certificados.qr_chave.'
 
 
 class GeracadCertificadosCursoAluno(models.Model):
@@ -46,49 +75,285 @@ class GeracadCertificadosCursoAluno(models.Model):
         index=True,
         help='Token único gerado automaticamente para verificação do certificado (QR code).',
     )
+    token_anterior = fields.Char(
+        string='Token anterior',
+        readonly=True,
+        copy=False,
+        index=True,
+        help='Token substituído na reemissão em massa; certificados impressos com ele continuam verificáveis.',
+    )
+
+    qrcode_png = fields.Binary(
+        string='QR code',
+        attachment=False,
+        readonly=True,
+        copy=False,
+        help='QR code de verificação (PNG compacto) gerado na criação do token.',
+    )
+    qrcode_url = fields.Char(
+        string='URL do QR code',
+        readonly=True,
+        copy=False,
+        help='URL codificada no QR gravado; se a URL de verificação mudar, o QR é regerado.',
+    )
 
     _sql_constraints = [
         ('token_unique', 'UNIQUE(token)', 'O token deve ser único.'),
     ]
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        """
+        Gera token único automaticamente para cada aluno inserido no curso (em lote, ver _gerar_tokens)
+        e o QR code do token já nos valores do INSERT. Com geracad_qrcode_adiado no contexto
+        (importação em massa), o QR é gerado só na primeira impressão.
+        """
+        sem_token = [vals for vals in vals_list if not vals.get('token')]
+        for vals, token in zip(sem_token, self._gerar_tokens(len(sem_token))):
+            vals['token'] = token
+        if not self.env.context.get('geracad_qrcode_adiado'):
+            hoje = fields.Datetime.now().date()
+            for vals in vals_list:
+                if not vals.get('qrcode_png'):
+                    assinatura = self._get_assinatura_qr(
+                        vals['token'], vals.get('nome_aluno'), vals.get('curso_id'), hoje,
+                    )
+                    vals.update(self._get_qrcode_vals(self._get_verification_url_token(vals['token'], assinatura)))
+        return super().create(vals_list)
+
+    def _get_token_formato(self):
+        """Formato dos tokens novos: 'uuid' (padrão) ou 'base32' (parâmetro geracad_certificados.token_formato)."""
+        formato = self.env['ir.config_parameter'].sudo().get_param('geracad_certificados.token_formato')
+        return formato if formato in filtro_tokens.FORMATOS else filtro_tokens.FORMATO_UUID
+
+    @api.model
+    def _gerar_tokens(self, quantidade, formato=None):
+        """
+        Gera `quantidade` tokens novos e distintos no formato configurado, conferidos contra os
+        tokens (atuais e anteriores) já gravados: uma consulta por rodada, refeita só para as colisões.
+        """
+        formato = formato or self._get_token_formato()
+        tokens = set()
+        while len(tokens) < quantidade:
+            novos = {filtro_tokens.gerar_token(formato) for _i in range(quantidade - len(tokens))} - tokens
+            if novos:
+                self.env.cr.execute(
+                    'SELECT token FROM {0} WHERE token = ANY(%s) '
+                    'UNION SELECT token_anterior FROM {0} WHERE token_anterior = ANY(%s)'.format(self._table),
+                    (list(novos), list(novos)),
+                )
+                novos -= {row[0] for row in self.env.cr.fetchall()}
+            tokens |= novos
+        return list(tokens)
+
+    def write(self, vals):
+        tokens = self._get_tokens_verificacao() if 'token' in vals or 'token_anterior' in vals else []
+        res = super().write(vals)
+        self._limpar_paginas_verificacao_cache(tokens)
+        return res
+
+    def unlink(self):
+        tokens = self._get_tokens_verificacao()
+        res = super().unlink()
+        self._limpar_paginas_verificacao_cache(tokens)
+        return res
+
+    def _get_tokens_verificacao(self):
+        """Tokens atuais e anteriores dos registros (os que abrem a página de verificação)."""
+        return [t for aluno in self for t in (aluno.token, aluno.token_anterior) if t]
+
     @api.model
-    def create(self, vals):
-        """Gera token único automaticamente para cada aluno inserido no curso."""
-        if not vals.get('token'):
-            vals['token'] = uuid.uuid4().hex
-        return super().create(vals)
+    def _get_pagina_verificacao_cache(self, token):
+        """Página de verificação do token cacheada neste worker (ver controllers/main.py) ou None."""
+        return _CACHE_PAGINAS_VERIFICACAO.get((self.env.cr.dbname, token))
+
+    @api.model
+    def _set_pagina_verificacao_cache(self, token, pagina):
+        _CACHE_PAGINAS_VERIFICACAO.set((self.env.cr.dbname, token), pagina)
+
+    @api.model
+    def _limpar_paginas_verificacao_cache(self, tokens=None):
+        """
+        Remove as páginas de verificação cacheadas neste worker dos `tokens` (todas, se None), para o
+        caminho rápido do QR assinado não servir token removido ou trocado. Nos outros workers a
+        página expira em verificacao_max_age segundos, o mesmo prazo dado a proxies e navegadores.
+        """
+        if tokens is None:
+            _CACHE_PAGINAS_VERIFICACAO.clear()
+            return
+        dbname = self.env.cr.dbname
+        for token in tokens:
+            _CACHE_PAGINAS_VERIFICACAO.pop((dbname, token))
+
+    @api.model
+    def _get_versao_tokens(self):
+        """
+        Versão dos tokens para o filtro: o maior id da tabela (pelo índice da chave primária), que muda
+        a cada aluno novo. Sem contador gravado a cada alteração, os INSERTs concorrentes não disputam
+        a mesma linha; tokens trocados em alunos existentes são achados pela busca de _token_no_filtro.
+        """
+        self.env.cr.execute('SELECT max(id) FROM {}'.format(self._table))
+        return self.env.cr.fetchone()[0] or 0
+
+    @api.model
+    def _get_filtro_tokens(self):
+        """
+        Filtro com todos os tokens existentes, atuais e anteriores (tools/filtro_tokens.py), montado uma vez
+        por worker e banco. A versão (_get_versao_tokens) é relida no máximo a cada INTERVALO_VERSAO_TOKENS
+        segundos e o filtro só é remontado se ela mudou; tokens removidos continuam no filtro até lá,
+        o que só leva a uma busca normal.
+        """
+        chave = self.env.cr.dbname
+        entrada = _CACHE_FILTRO_TOKENS.get(chave)
+        agora = time.monotonic()
+        if entrada and agora - entrada[2] < INTERVALO_VERSAO_TOKENS:
+            return entrada[1]
+        # Versão lida antes dos tokens: um commit entre as duas leituras só deixa o filtro mais novo que a versão
+        versao = self._get_versao_tokens()
+        if entrada and entrada[0] == versao:
+            _CACHE_FILTRO_TOKENS.set(chave, (versao, entrada[1], agora))
+            return entrada[1]
+        self.env.cr.execute(
+            'SELECT token FROM {0} WHERE token IS NOT NULL '
+            'UNION ALL SELECT token_anterior FROM {0} WHERE token_anterior IS NOT NULL'.format(self._table)
+        )
+        filtro = FiltroTokens(row[0] for row in self.env.cr.fetchall())
+        _CACHE_FILTRO_TOKENS.set(chave, (versao, filtro, agora))
+        return filtro
+
+    @api.model
+    def _token_no_filtro(self, token):
+        """
+        True se o token pode existir. Formato inválido é recusado sem banco; fora do filtro, o token é
+        procurado pelos índices de token e token_anterior (token novo ou trocado depois da montagem do filtro)
+        e, se existir, o filtro é marcado para remontagem na próxima conferência da versão.
+        """
+        if not filtro_tokens.formato_valido(token):
+            return False
+        if token in self._get_filtro_tokens():
+            return True
+        self.env.cr.execute(
+            'SELECT 1 FROM {0} WHERE token = %s UNION ALL SELECT 1 FROM {0} WHERE token_anterior = %s LIMIT 1'.format(
+                self._table,
+            ),
+            (token, token),
+        )
+        if not self.env.cr.fetchone():
+            return False
+        self._invalidar_filtro_tokens()
+        return True
+
+    @api.model
+    def _invalidar_filtro_tokens(self):
+        """Força a remontagem do filtro do banco atual na próxima conferência da versão (sem remontar agora)."""
+        chave = self.env.cr.dbname
+        entrada = _CACHE_FILTRO_TOKENS.get(chave)
+        if entrada and entrada[0] is not None:
+            _CACHE_FILTRO_TOKENS.set(chave, (None, entrada[1], entrada[2]))
+
+    @api.model
+    def _buscar_por_token(self, token):
+        """Aluno do token, atual ou anterior (reemissão); o token atual tem prioridade."""
+        alunos = self.search(['|', ('token', '=', token), ('token_anterior', '=', token)], limit=2)
+        return alunos.filtered(lambda a: a.token == token)[:1] or alunos[:1]
+
+    @api.model
+    def _reemitir_tokens(self, formato=filtro_tokens.FORMATO_BASE32, somente_outro_formato=True, tamanho_lote=1000):
+        """
+        Reemite os tokens em massa (migração para outro formato). O token atual vai para token_anterior,
+        que continua válido na verificação (QR já impressos); QR e URL gravados são limpos e regerados
+        na próxima impressão (ou por _regenerar_qrcodes). Uma reemissão seguinte substitui o anterior.
+        Uso: odoo-bin shell -> env['geracad.certificados.curso.aluno']._reemitir_tokens(); env.cr.commit()
+        :param somente_outro_formato: pula os alunos cujo token já está no formato pedido
+        :return: quantidade de tokens reemitidos
+        """
+        total = 0
+        ultimo_id = 0
+        while True:
+            self.env.cr.execute(
+                'SELECT id, token FROM {} WHERE id > %s ORDER BY id LIMIT %s'.format(self._table),
+                (ultimo_id, tamanho_lote),
+            )
+            linhas = self.env.cr.fetchall()
+            if not linhas:
+                break
+            ultimo_id = linhas[-1][0]
+            if somente_outro_formato:
+                linhas = [(id_, token) for id_, token in linhas if filtro_tokens.formato_do_token(token) != formato]
+            if not linhas:
+                continue
+            novos = self._gerar_tokens(len(linhas), formato=formato)
+            self.env.cr.execute(
+                'UPDATE {} t SET token_anterior = t.token, token = v.token, qrcode_png = NULL, qrcode_url = NULL, '
+                "write_uid = %s, write_date = (now() at time zone 'UTC') "
+                'FROM unnest(%s::int[], %s::varchar[]) AS v(id, token) WHERE t.id = v.id'.format(self._table),
+                (self.env.uid, [id_ for id_, _token in linhas], novos),
+            )
+            total += len(linhas)
+        self.invalidate_cache()
+        if total:
+            # Tokens anteriores substituídos deixam de valer: nenhuma página cacheada neste worker é reaproveitada
+            self._limpar_paginas_verificacao_cache()
+        return total
 
     def _get_module_static_path(self, *parts):
         """Retorna o caminho absoluto para um arquivo em static/ do módulo."""
         module_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         return os.path.join(module_dir, 'static', *parts)
 
-    def _get_static_image_data_uri(self, *path_parts, mime='image/png'):
+    @instrumentacao.medir_etapa('estaticos')
+    def _get_static_image_data_uri(self, *path_parts, mime='image/png', largura_max=None):
         """
         Lê imagem do static do módulo e retorna data URI (base64).
         Garante que o PDF mostre a imagem sem depender de URL (wkhtmltopdf não acessa URLs em alguns ambientes).
+        O conteúdo fica em cache no worker e é relido só quando o mtime do arquivo muda (tools/estaticos.py).
+        :param largura_max: largura máxima em px (PNG); imagens maiores são reduzidas uma única vez
         """
-        try:
-            path = self._get_module_static_path(*path_parts)
-            if not os.path.isfile(path):
-                return ''
-            with open(path, 'rb') as f:
-                data = base64.b64encode(f.read()).decode('ascii')
-            return 'data:%s;base64,%s' % (mime, data)
-        except Exception:
-            return ''
+        path = self._get_module_static_path(*path_parts)
+        return estaticos.data_uri_arquivo(path, mime=mime, largura_max=largura_max)
+
+    def _get_largura_fundo_px(self):
+        """
+        Largura em px do fundo para a página A4 paisagem (297 mm) no DPI do paperformat do certificado.
+        O DPI pode ser sobrescrito pelo parâmetro geracad_certificados.fundo_dpi.
+        """
+        dpi = self.env['ir.config_parameter'].sudo().get_param('geracad_certificados.fundo_dpi')
+        if not dpi:
+            paperformat = self.env.ref('geracad_certificados.paperformat_certificado', raise_if_not_found=False)
+            dpi = paperformat.dpi if paperformat else 90
+        return int(round(297 / 25.4 * int(dpi)))
 
     def _get_certificado_fundo_data_uri(self):
-        """Data URI da imagem de fundo do certificado (embed no HTML para o PDF)."""
-        return self._get_static_image_data_uri('img', 'certificado_fundo.png')
+        """Data URI da imagem de fundo do certificado (embed no HTML para o PDF), reduzida ao DPI da página."""
+        return self._get_static_image_data_uri(
+            'img', 'certificado_fundo.png', largura_max=self._get_largura_fundo_px(),
+        )
 
     def _get_canto_tl_data_uri(self):
         """Data URI do ornamento de canto (SVG)."""
         return self._get_static_image_data_uri('img', 'certificado_canto_tl.svg', mime='image/svg+xml')
 
     def _get_selo_data_uri(self):
-        """Data URI do selo (PNG – selo tipo fita/medalha no certificado)."""
-        return self._get_static_image_data_uri('img', 'certificado_selo.png', mime='image/png')
+        """Data URI do selo (PNG – selo tipo fita/medalha no certificado), reduzido ao tamanho exibido."""
+        return self._get_static_image_data_uri(
+            'img', 'certificado_selo.png', mime='image/png', largura_max=imagem.SELO_LARGURA_MAX,
+        )
+
+    @api.model
+    @instrumentacao.medir_etapa('fontes')
+    def get_certificado_fonte_css(self):
+        """CSS @font-face da fonte do certificado, embutida (static/fonts); '' se os arquivos não existirem."""
+        variantes = [
+            (self._get_static_image_data_uri('fonts', arquivo, mime=fontes.MIME_TTF), peso, estilo)
+            for arquivo, peso, estilo in fontes.VARIANTES
+        ]
+        return fontes.css_font_face(fontes.FAMILIA, variantes)
+
+    @api.model
+    def _get_certificado_fonte_css_arquivo(self):
+        """Arquivo com o CSS da fonte, para o --user-style-sheet do wkhtmltopdf; None se não houver fonte."""
+        css = self.get_certificado_fonte_css()
+        return fontes.arquivo_css(css) if css else None
 
     def _get_base_url(self):
         """URL base do sistema (para link de verificação do QR)."""
@@ -96,35 +361,475 @@ class GeracadCertificadosCursoAluno(models.Model):
 
     def _get_verification_url(self):
         """
-        Retorna a URL absoluta para verificação do certificado.
+        Retorna a URL absoluta para verificação do certificado (com a carga assinada, se ativada).
         """
         self.ensure_one()
+        assinatura = self._get_assinatura_qr(
+            self.token, self.nome_aluno, self.curso_id.id, self._get_data_emissao(),
+        )
+        return self._get_verification_url_token(self.token, assinatura)
+
+    @api.model
+    def _get_verification_url_token(self, token, assinatura=''):
+        """
+        URL absoluta de verificação para um token (também antes de o registro existir).
+        Tokens base32 usam a rota curta /V/<token> com esquema e domínio em maiúsculas (quando a
+        URL base não tem caminho): a URL inteira cabe no modo alfanumérico do QR, mais compacto.
+        """
         base = self._get_base_url()
-        return '%s/certificados/verificar/%s' % (base, self.token or '')
+        if filtro_tokens.formato_do_token(token) == filtro_tokens.FORMATO_BASE32:
+            if '/' not in base.partition('://')[2]:
+                base = base.upper()
+            url = '%s/V/%s' % (base, token)
+        else:
+            url = '%s/certificados/verificar/%s' % (base, token or '')
+        return '%s?s=%s' % (url, assinatura) if assinatura else url
 
-    def get_company_logo_data_uri(self):
-        """Retorna o logo da empresa como data URI (string) para uso em img src. Evita erro ao concatenar bytes."""
+    def _get_data_emissao(self):
+        """Data de emissão que entra na carga assinada do QR (data de criação do registro, UTC)."""
         self.ensure_one()
-        logo = self.env.company.logo
-        if not logo:
+        return (self.create_date or fields.Datetime.now()).date()
+
+    def _qr_assinado_ativo(self):
+        valor = self.env['ir.config_parameter'].sudo().get_param('geracad_certificados.qr_assinado')
+        return tools.str2bool(valor or 'False')
+
+    @tools.ormcache()
+    def _get_chaves_qr(self):
+        """
+        kid -> chave HMAC, lidas dos parâmetros geracad_certificados.qr_chave.<kid>.
+        Em ormcache (sem banco na verificação); alterar parâmetros limpa o cache em todos os workers.
+        """
+        params = self.env['ir.config_parameter'].sudo().search_read(
+            [('key', '=like', PREFIXO_CHAVE_QR + '%')], ['key', 'value'],
+        )
+        return {p['key'][len(PREFIXO_CHAVE_QR):]: p['value'] for p in params if p['value']}
+
+    @api.model
+    def _criar_chave_qr(self):
+        """
+        Cria uma chave nova (k1, k2, ...) e a torna a chave de assinatura atual.
+        O parâmetro da chave é inserido só se ainda não existir (INSERT ... ON CONFLICT DO NOTHING):
+        duas criações simultâneas ficam com kids diferentes (ou uma falha por serialização e é
+        repetida pelo Odoo) e nenhuma chave é sobrescrita.
+        """
+        self.env.cr.execute(
+            'SELECT key FROM ir_config_parameter WHERE key LIKE %s', (PREFIXO_CHAVE_QR + 'k%',),
+        )
+        numeros = [
+            int(key[len(PREFIXO_CHAVE_QR) + 1:]) for key, in self.env.cr.fetchall()
+            if key[len(PREFIXO_CHAVE_QR) + 1:].isdigit()
+        ]
+        numero = max(numeros or [0]) + 1
+        chave = secrets.token_urlsafe(32)
+        while True:
+            kid = 'k%d' % numero
+            self.env.cr.execute(
+                "INSERT INTO ir_config_parameter (key, value, create_uid, create_date, write_uid, write_date) "
+                "VALUES (%s, %s, %s, now() at time zone 'UTC', %s, now() at time zone 'UTC') "
+                "ON CONFLICT (key) DO NOTHING RETURNING id",
+                (PREFIXO_CHAVE_QR + kid, chave, self.env.uid, self.env.uid),
+            )
+            if self.env.cr.fetchone():
+                break
+            numero += 1
+        # set_param limpa o ormcache: _get_chaves_qr passa a ver a chave nova em todos os workers
+        self.env['ir.config_parameter'].sudo().set_param('geracad_certificados.qr_chave_atual', kid)
+        return kid, chave
+
+    @api.model
+    def _garantir_chave_qr(self):
+        """Cria a primeira chave, se ainda não houver chave atual (ao ligar geracad_certificados.qr_assinado)."""
+        kid, chave = self._get_chave_qr_atual()
+        if not chave:
+            kid, chave = self._criar_chave_qr()
+        return kid, chave
+
+    @api.model
+    def _get_chave_qr_atual(self):
+        """
+        (kid, chave) usados para assinar (geracad_certificados.qr_chave_atual), ou (None, None).
+        Só lê: a chave é criada ao ligar a opção ou na rotação, nunca durante uma impressão.
+        """
+        kid = self.env['ir.config_parameter'].sudo().get_param('geracad_certificados.qr_chave_atual')
+        chave = self._get_chaves_qr().get(kid or '')
+        return (kid, chave) if chave else (None, None)
+
+    @api.model
+    def _get_assinatura_qr(self, token, nome_aluno, curso_id, data_emissao):
+        """Carga assinada da URL do QR ('' se geracad_certificados.qr_assinado estiver desligado ou sem chave)."""
+        if not self._qr_assinado_ativo():
+            return ''
+        kid, chave = self._get_chave_qr_atual()
+        if not chave:
+            _logger.warning('QR assinado ligado sem chave atual; URL gerada sem assinatura.')
             return ''
-        if isinstance(logo, bytes):
-            logo = logo.decode('ascii')
-        return 'data:image/png;base64,' + logo
+        return assinatura_qr.assinar(chave, kid, token, nome_aluno, curso_id, data_emissao)
 
-    def get_qrcode_base64(self):
-        """Gera QR code com a URL de verificação; retorna PNG em base64."""
+    @api.model
+    def _verificar_assinatura_qr(self, token, carga):
+        """
+        Confere a carga do QR só com as chaves em memória: True (válida), False (forjada ou
+        corrompida) ou None (chave desconhecida, ex.: parâmetro removido; segue a verificação normal).
+        """
+        kid = assinatura_qr.ler_kid(carga)
+        if kid is None:
+            return False
+        chave = self._get_chaves_qr().get(kid)
+        if not chave:
+            return None
+        return assinatura_qr.verificar(chave, token, carga)
+
+    @api.model
+    def action_rotacionar_chave_qr(self):
+        """
+        Rotação da chave do QR assinado: cria uma chave nova, que passa a assinar, e regrava os QR
+        (e, pela impressão digital, os PDFs na próxima impressão) com ela. As chaves anteriores
+        continuam válidas para certificados já impressos; remover o parâmetro de uma chave deixa
+        as cargas dela sem verificação criptográfica (a verificação volta a usar o banco).
+        Uso: odoo-bin shell -> env['geracad.certificados.curso.aluno'].action_rotacionar_chave_qr(); env.cr.commit()
+        :return: quantidade de QR regravados
+        """
+        self._criar_chave_qr()
+        return self._regenerar_qrcodes()
+
+    @instrumentacao.medir_etapa('logo')
+    def get_company_logo_data_uri(self):
+        """Logo da empresa como data URI para o certificado, reduzido ao tamanho exibido (imagem.LOGO_CERTIFICADO_MAX)."""
         self.ensure_one()
+        png = self.env.company._get_logo_variante_png(*imagem.LOGO_CERTIFICADO_MAX)
+        if not png:
+            return ''
+        mime = 'image/jpeg' if png[:2] == b'\xff\xd8' else 'image/png'
+        return 'data:%s;base64,%s' % (mime, base64.b64encode(png).decode('ascii'))
+
+    def _get_qrcode_formato(self):
+        """Formato do QR no certificado: 'png' (padrão) ou 'svg' (parâmetro geracad_certificados.qrcode_formato)."""
+        formato = self.env['ir.config_parameter'].sudo().get_param('geracad_certificados.qrcode_formato')
+        return 'svg' if formato == 'svg' else 'png'
+
+    @api.model
+    def _get_qrcode_vals(self, url):
+        """Valores de qrcode_png/qrcode_url para a URL de verificação ({} se a biblioteca qrcode não estiver instalada)."""
         try:
-            import qrcode
-            from io import BytesIO
+            png = qr.gerar_qrcode_png(url)
         except ImportError:
-            return ''
+            return {}
+        return {
+            'qrcode_png': base64.b64encode(png),
+            'qrcode_url': url,
+        }
+
+    def _gerar_qrcode(self):
+        """Gera e grava o QR (PNG compacto) com a URL de verificação atual de cada registro."""
+        for aluno in self:
+            vals = aluno._get_qrcode_vals(aluno._get_verification_url())
+            if not vals:
+                return
+            aluno.sudo().write(vals)
+
+    @api.model
+    def _regenerar_qrcodes(self, somente_desatualizados=True, tamanho_lote=500):
+        """
+        Regera em massa os QR codes gravados (ex.: após mudar web.base.url ou para linhas antigas).
+        Uso: odoo-bin shell -> env['geracad.certificados.curso.aluno']._regenerar_qrcodes(); env.cr.commit()
+        :return: quantidade de registros regerados
+        """
+        total = 0
+        ultimo_id = 0
+        while True:
+            alunos = self.search([('id', '>', ultimo_id)], order='id', limit=tamanho_lote)
+            if not alunos:
+                break
+            ultimo_id = alunos[-1].id
+            if somente_desatualizados:
+                alunos = alunos.filtered(lambda a: not a.qrcode_png or a.qrcode_url != a._get_verification_url())
+            alunos._gerar_qrcode()
+            total += len(alunos)
+            alunos.invalidate_cache(['qrcode_png'])
+        return total
+
+    def action_regenerar_qrcode(self):
+        """Ação (menu Ação da lista de alunos): regera o QR dos registros selecionados."""
+        self._gerar_qrcode()
+        return True
+
+    def get_qrcode_base64(self):
+        """
+        Retorna o PNG do QR code (base64) com a URL de verificação.
+        Usa o QR gravado na criação; só regera (e grava) se a URL mudou, ex.: web.base.url alterado.
+        """
+        self.ensure_one()
         url = self._get_verification_url()
-        buffer = BytesIO()
-        img = qrcode.make(url)
-        img.save(buffer, format='PNG')
-        return base64.b64encode(buffer.getvalue()).decode('ascii')
+        if not self.qrcode_png or self.qrcode_url != url:
+            self._gerar_qrcode()
+        if not self.qrcode_png:
+            return ''
+        qrcode_png = self.qrcode_png
+        return qrcode_png.decode('ascii') if isinstance(qrcode_png, bytes) else qrcode_png
+
+    @instrumentacao.medir_etapa('qrcode')
+    def get_qrcode_data_uri(self):
+        """Data URI do QR para o certificado, em PNG ou SVG conforme geracad_certificados.qrcode_formato."""
+        self.ensure_one()
+        if self._get_qrcode_formato() == 'svg':
+            url = self._get_verification_url()
+            svg = _CACHE_QRCODE_SVG.get(url)
+            if svg is None:
+                try:
+                    svg = base64.b64encode(qr.gerar_qrcode_svg(url)).decode('ascii')
+                except ImportError:
+                    svg = ''
+                _CACHE_QRCODE_SVG.set(url, svg)
+            return 'data:image/svg+xml;base64,%s' % svg if svg else ''
+        b64 = self.get_qrcode_base64()
+        return 'data:image/png;base64,%s' % b64 if b64 else ''
+
+    def _get_versao_views(self, xmlids):
+        """sha1 da versão instalada do módulo + arch das views (xmlids do módulo) e das que as herdam."""
+        views = self.env['ir.ui.view'].sudo()
+        for xmlid in xmlids:
+            view = self.env.ref('geracad_certificados.%s' % xmlid).sudo()
+            views |= view | view.inherit_children_ids
+        modulo = self.env['ir.module.module'].sudo().search([('name', '=', 'geracad_certificados')], limit=1)
+        partes = [modulo.latest_version or ''] + [v.arch_db or '' for v in views]
+        return hashlib.sha1('\n'.join(partes).encode('utf-8')).hexdigest()
+
+    @tools.ormcache()
+    def _get_template_versao(self):
+        """
+        Versão do template do certificado: versão instalada do módulo + arch do template e das
+        views que o herdam. Cacheado no registry (limpo quando views são alteradas ou no upgrade).
+        """
+        return self._get_versao_views((
+            'report_certificado_template', 'report_certificado_estilos', 'report_certificado_verso_conteudo',
+            'report_certificado_verso_template',
+        ))
+
+    @tools.ormcache()
+    def _get_verificacao_template_versao(self):
+        """Versão da página de verificação (certificado_verificar_page e herdeiras), para ETag e exportação."""
+        return self._get_versao_views(('certificado_verificar_page',))
+
+    def _get_versao_estaticos(self):
+        """mtime dos arquivos de static/ embutidos no certificado (fundo, selo e fontes) e largura do fundo."""
+        caminhos = [
+            self._get_module_static_path('img', 'certificado_fundo.png'),
+            self._get_module_static_path('img', 'certificado_selo.png'),
+        ] + [self._get_module_static_path('fonts', arquivo) for arquivo, _peso, _estilo in fontes.VARIANTES]
+        versao = [self._get_largura_fundo_px()]
+        for caminho in caminhos:
+            try:
+                versao.append(os.stat(caminho).st_mtime)
+            except OSError:
+                versao.append(None)
+        return versao
+
+    def get_certificado_fingerprint(self):
+        """
+        Impressão digital (sha1) de tudo que afeta o PDF do certificado: campos do aluno e do curso,
+        hashes das assinaturas, logo da empresa, URL e formato do QR, versão do template, arquivos
+        estáticos (fundo, selo, fontes) e motor do PDF.
+        Usada no nome do anexo do relatório (attachment_use): se algo muda, o nome muda e o PDF é regerado.
+        """
+        self.ensure_one()
+        company = self.env.company
+        report = self.env.ref('geracad_certificados.action_report_certificado').sudo()
+        dados = [
+            self._get_template_versao(),
+            self._get_versao_estaticos(),
+            report._get_motor_certificado(),
+            self._get_verification_url(),
+            self._get_qrcode_formato(),
+            imagem.VERSAO_VARIANTES,
+            self.nome_aluno,
+            self.aluno_categoria,
+            self.aluno_registro,
+            self.aluno_renach,
+            self.token,
+            self.curso_id._get_certificado_fingerprint_dados(),
+            company.id,
+            company.name,
+            self.curso_id._hash_binario(company.logo),
+        ]
+        return hashlib.sha1(json.dumps(dados, default=str).encode('utf-8')).hexdigest()
+
+    def _get_verificacao_last_modified(self):
+        """Última alteração de algo exibido na página de verificação (aluno, curso, instrutor, responsável)."""
+        self.ensure_one()
+        curso = self.curso_id
+        datas = [
+            data for data in (
+                self.write_date,
+                curso.write_date,
+                curso.instrutor_id.write_date,
+                curso.responsavel_tecnico_id.write_date,
+            ) if data
+        ]
+        return max(datas) if datas else fields.Datetime.now()
+
+    def _get_verificacao_etag(self, company_data):
+        """
+        ETag da página de verificação: token + última alteração + versão dos dados da empresa e do
+        template da página. É também a chave de mudança da exportação estática.
+        """
+        self.ensure_one()
+        partes = [
+            self.token or '',
+            fields.Datetime.to_string(self._get_verificacao_last_modified()),
+            company_data.get('company_versao') or '',
+            self._get_verificacao_template_versao(),
+        ]
+        return hashlib.sha1('|'.join(partes).encode('utf-8')).hexdigest()
+
+    @instrumentacao.medir_etapa('valores_verificacao')
+    def _get_verificacao_valores(self, company_data=None):
+        """Valores do template certificado_verificar_page (controller e exportação estática)."""
+        self.ensure_one()
+        if company_data is None:
+            company_data = self.env.company._get_certificado_company_data()
+        return {
+            'linha': self,
+            'curso': self.curso_id,
+            'nome_aluno': self.nome_aluno,
+            **company_data,
+        }
+
+    @api.model
+    def _verificar_tokens_lote(self, tokens, tamanho_bloco=1000):
+        """
+        Verificação em lote (API JSON/NDJSON para auditores). Retorna um dict por token, na ordem recebida,
+        com status 'valido', 'nao_encontrado' ou 'formato_invalido' e, se válido, aluno, curso, período,
+        carga horária e instrutor (e token_atual, se o token consultado foi substituído na reemissão).
+        Uma busca (IN) por bloco de tokens distintos; cursos e instrutores vêm pelo prefetch do ORM.
+        Tokens com formato inválido (ou que não são texto) nem chegam ao banco; os demais são buscados pelos índices de token e
+        token_anterior, inclusive os fora do filtro em memória (token novo ou trocado depois da montagem).
+        """
+        consultar = list(dict.fromkeys(t for t in tokens if filtro_tokens.formato_valido(t)))
+        filtro = self._get_filtro_tokens()
+        por_token = {}
+        for i in range(0, len(consultar), tamanho_bloco):
+            bloco = consultar[i:i + tamanho_bloco]
+            for linha in self.search(['|', ('token', 'in', bloco), ('token_anterior', 'in', bloco)]):
+                if linha.token_anterior:
+                    por_token.setdefault(linha.token_anterior, linha)
+                por_token[linha.token] = linha
+        periodos = {}
+        resultados = []
+        for token in tokens:
+            linha = por_token.get(token) if isinstance(token, str) else None
+            if not linha:
+                status = 'nao_encontrado' if filtro_tokens.formato_valido(token) else 'formato_invalido'
+                resultados.append({'token': token, 'status': status})
+                continue
+            if token not in filtro:
+                self._invalidar_filtro_tokens()
+            resultado = linha._get_verificacao_dados(periodos)
+            if linha.token != token:
+                # Token anterior (reemissão): informa o atual
+                resultado.update(token=token, token_atual=linha.token)
+            resultados.append(resultado)
+        return resultados
+
+    def _get_verificacao_dados(self, periodos=None):
+        """
+        Resultado 'valido' da verificação em lote (também o JSON da exportação estática).
+        :param periodos: dict {curso_id: período} reaproveitado entre linhas do mesmo curso
+        """
+        self.ensure_one()
+        curso = self.curso_id
+        if periodos is None:
+            periodos = {}
+        if curso.id not in periodos:
+            periodos[curso.id] = curso.get_periodo_display()
+        return {
+            'token': self.token,
+            'status': 'valido',
+            'aluno': self.nome_aluno,
+            'curso': curso.name,
+            'periodo': periodos[curso.id],
+            'carga_horaria': curso.carga_horaria,
+            'instrutor': curso.instrutor_id.name or '',
+        }
+
+    @api.model
+    def _exportar_verificacao_estatica(self, diretorio=None, completa=False, tamanho_lote=1000):
+        """
+        Exporta a página de verificação (HTML) e os dados (JSON) de cada aluno para o diretório
+        (parâmetro geracad_certificados.exportacao_dir), no layout de tools/exportacao_estatica.py,
+        para o nginx responder os QR codes sem passar pelo Odoo.
+        Incremental: o manifesto guarda a ETag de cada página (aluno, curso, instrutor, responsável,
+        dados da empresa e versão do template da página, com as views herdadas) e só as que mudaram
+        são reescritas; arquivos de tokens que não existem mais são removidos. completa=True reescreve tudo.
+        Uso: cron "Certificados: exportar páginas de verificação" ou
+        odoo-bin shell -> env['geracad.certificados.curso.aluno']._exportar_verificacao_estatica()
+        :return: dict com as quantidades gravadas, removidas e inalteradas
+        """
+        diretorio = diretorio or self.env['ir.config_parameter'].sudo().get_param(
+            'geracad_certificados.exportacao_dir',
+        )
+        if not diretorio:
+            return {}
+        company = self.env.company
+        company_data = company._get_certificado_company_data()
+        anterior = {} if completa else exportacao_estatica.ler_manifesto(diretorio)
+        paginas = {}
+        contagem = {'gravadas': 0, 'removidas': 0, 'inalteradas': 0}
+        periodos = {}
+        View = self.env['ir.ui.view'].sudo()
+        ultimo_id = 0
+        while True:
+            alunos = self.sudo().search([('id', '>', ultimo_id)], order='id', limit=tamanho_lote)
+            if not alunos:
+                break
+            ultimo_id = alunos[-1].id
+            for aluno in alunos:
+                html = exportacao_estatica.caminho_token(diretorio, aluno.token, 'html')
+                if not html:
+                    continue
+                etag = aluno._get_verificacao_etag(company_data)
+                paginas[aluno.token] = etag
+                if anterior.get(aluno.token) == etag:
+                    contagem['inalteradas'] += 1
+                    continue
+                corpo = View._render_template(
+                    'geracad_certificados.certificado_verificar_page',
+                    aluno._get_verificacao_valores(company_data),
+                )
+                if isinstance(corpo, str):
+                    corpo = corpo.encode('utf-8')
+                exportacao_estatica.gravar(html, corpo)
+                exportacao_estatica.gravar(
+                    exportacao_estatica.caminho_token(diretorio, aluno.token, 'json'),
+                    json.dumps(aluno._get_verificacao_dados(periodos), ensure_ascii=False).encode('utf-8'),
+                )
+                contagem['gravadas'] += 1
+            alunos.invalidate_cache()
+        for token in set(anterior) - set(paginas):
+            for extensao in ('html', 'json'):
+                caminho = exportacao_estatica.caminho_token(diretorio, token, extensao)
+                if caminho:
+                    exportacao_estatica.remover(caminho)
+            contagem['removidas'] += 1
+        logo = company._get_logo_variante_png(*imagem.LOGO_VERIFICACAO_MAX)
+        caminho_logo = os.path.join(diretorio, 'logo', str(company.id))
+        if logo:
+            exportacao_estatica.gravar(caminho_logo, logo)
+        else:
+            exportacao_estatica.remover(caminho_logo)
+        exportacao_estatica.gravar_manifesto(
+            diretorio, paginas, company_versao=company_data['company_versao'],
+            exportado_em=fields.Datetime.to_string(fields.Datetime.now()),
+        )
+        _logger.info(
+            'Exportação estática das páginas de verificação em %s: %s', diretorio, contagem,
+        )
+        return contagem
+
+    @api.model
+    def _cron_exportar_verificacao_estatica(self):
+        """Cron: exportação incremental (não faz nada sem o parâmetro geracad_certificados.exportacao_dir)."""
+        self._exportar_verificacao_estatica()
 
     def action_gerar_certificado(self):
         """Abre o relatório PDF do certificado para o registro atual."""
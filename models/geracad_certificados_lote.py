@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+Modelo geracad.certificados.lote: emissão em segundo plano de todos os certificados de um curso.
+O lote é criado pelo botão "Gerar todos os certificados" do curso e processado pelo cron
+em blocos (parâmetro geracad_certificados.lote_tamanho_bloco), com commit a cada bloco.
+Cada bloco é gerado numa única chamada do relatório (um processo wkhtmltopdf) e cada linha aponta
+para o PDF que o relatório já guarda por aluno (attachment_use); ao final é gerado um ZIP com todos.
+Alunos com falha podem ser reprocessados sem gerar de novo os que já foram concluídos.
+"""
+
+import base64
+import logging
+import tempfile
+import zipfile
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+TAMANHO_BLOCO_PADRAO = 20
+
+
+class GeracadCertificadosLote(models.Model):
+    _name = 'geracad.certificados.lote'
+    _description = 'Lote de emissão de certificados de um curso'
+    _order = 'id desc'
+
+    name = fields.Char(string='Lote', required=True, readonly=True)
+    curso_id = fields.Many2one(
+        'geracad.certificados.curso',
+        string='Curso',
+        required=True,
+        readonly=True,
+        ondelete='cascade',
+    )
+    state = fields.Selection(
+        [
+            ('fila', 'Na fila'),
+            ('processando', 'Processando'),
+            ('concluido', 'Concluído'),
+            ('falha', 'Concluído com falhas'),
+        ],
+        string='Situação',
+        default='fila',
+        required=True,
+        readonly=True,
+    )
+    linha_ids = fields.One2many(
+        'geracad.certificados.lote.linha',
+        'lote_id',
+        string='Alunos',
+        readonly=True,
+    )
+    qtd_total = fields.Integer(string='Total', compute='_compute_progresso')
+    qtd_concluida = fields.Integer(string='Concluídos', compute='_compute_progresso')
+    qtd_falha = fields.Integer(string='Falhas', compute='_compute_progresso')
+    progresso = fields.Float(string='Progresso (%)', compute='_compute_progresso')
+    zip_attachment_id = fields.Many2one(
+        'ir.attachment',
+        string='Arquivo ZIP',
+        readonly=True,
+        copy=False,
+    )
+    date_inicio = fields.Datetime(string='Início do processamento', readonly=True)
+    date_fim = fields.Datetime(string='Fim do processamento', readonly=True)
+
+    @api.depends('linha_ids.state')
+    def _compute_progresso(self):
+        for lote in self:
+            estados = lote.linha_ids.mapped('state')
+            lote.qtd_total = len(estados)
+            lote.qtd_concluida = estados.count('concluido')
+            lote.qtd_falha = estados.count('falha')
+            feitos = lote.qtd_concluida + lote.qtd_falha
+            lote.progresso = 100.0 * feitos / lote.qtd_total if lote.qtd_total else 0.0
+
+    def _agendar_processamento(self):
+        """Dispara o cron de lotes assim que possível (sem esperar o próximo intervalo)."""
+        cron = self.env.ref('geracad_certificados.ir_cron_processar_lotes_certificados', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    def action_reprocessar_falhas(self):
+        """Volta as linhas com falha para pendente e recoloca o lote na fila."""
+        for lote in self:
+            falhas = lote.linha_ids.filtered(lambda l: l.state == 'falha')
+            if not falhas:
+                continue
+            falhas.write({'state': 'pendente', 'erro': False})
+            if lote.zip_attachment_id:
+                lote.zip_attachment_id.unlink()
+            lote.write({'state': 'fila', 'date_fim': False})
+        self._agendar_processamento()
+        return True
+
+    def action_baixar_zip(self):
+        """Baixa o ZIP com os PDFs de todos os alunos concluídos."""
+        self.ensure_one()
+        if not self.zip_attachment_id:
+            raise UserError(_('O arquivo ZIP ainda não foi gerado para este lote.'))
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/web/content/%s?download=true' % self.zip_attachment_id.id,
+            'target': 'self',
+        }
+
+    @api.model
+    def _cron_processar_lotes(self):
+        """Processa os lotes na fila, um bloco de alunos por vez, com commit a cada bloco."""
+        tamanho_bloco = int(
+            self.env['ir.config_parameter'].sudo().get_param(
+                'geracad_certificados.lote_tamanho_bloco', TAMANHO_BLOCO_PADRAO,
+            )
+        )
+        lotes = self.search([('state', 'in', ('fila', 'processando'))], order='id')
+        for lote in lotes:
+            if lote.state == 'fila':
+                lote.write({'state': 'processando', 'date_inicio': fields.Datetime.now()})
+            while True:
+                pendentes = self.env['geracad.certificados.lote.linha'].search(
+                    [('lote_id', '=', lote.id), ('state', '=', 'pendente')],
+                    limit=tamanho_bloco,
+                )
+                if not pendentes:
+                    break
+                pendentes._gerar_pdf()
+                self.env.cr.commit()
+            lote._finalizar()
+            self.env.cr.commit()
+
+    def _finalizar(self):
+        """Gera o ZIP com os PDFs concluídos e define a situação final do lote."""
+        for lote in self:
+            concluidas = lote.linha_ids.filtered(lambda l: l.state == 'concluido' and l.attachment_id)
+            if concluidas:
+                lote.zip_attachment_id = lote._gerar_zip(concluidas)
+            lote.write({
+                'state': 'falha' if lote.linha_ids.filtered(lambda l: l.state == 'falha') else 'concluido',
+                'date_fim': fields.Datetime.now(),
+            })
+            _logger.info(
+                'Lote de certificados %s (curso %s): %s concluídos, %s falhas',
+                lote.id, lote.curso_id.id, lote.qtd_concluida, lote.qtd_falha,
+            )
+
+    def _gerar_zip(self, linhas):
+        """Monta o ZIP em arquivo temporário (não mantém todos os PDFs em memória ao mesmo tempo)."""
+        self.ensure_one()
+        nomes_usados = set()
+        with tempfile.TemporaryFile() as tmp:
+            with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as zf:
+                for linha in linhas:
+                    nome = 'Certificado - %s.pdf' % linha.aluno_id.nome_aluno
+                    if nome in nomes_usados:
+                        nome = '%s - %s.pdf' % (nome[:-4], linha.aluno_id.token)
+                    nomes_usados.add(nome)
+                    zf.writestr(nome, linha.attachment_id.raw)
+            tmp.seek(0)
+            return self.env['ir.attachment'].create({
+                'name': 'Certificados - %s.zip' % self.curso_id.name,
+                'res_model': self._name,
+                'res_id': self.id,
+                'type': 'binary',
+                'datas': base64.b64encode(tmp.read()),
+                'mimetype': 'application/zip',
+            })
+
+
+class GeracadCertificadosLoteLinha(models.Model):
+    _name = 'geracad.certificados.lote.linha'
+    _description = 'Aluno de um lote de emissão de certificados'
+    _order = 'id'
+
+    lote_id = fields.Many2one(
+        'geracad.certificados.lote',
+        string='Lote',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    aluno_id = fields.Many2one(
+        'geracad.certificados.curso.aluno',
+        string='Aluno',
+        required=True,
+        ondelete='cascade',
+    )
+    nome_aluno = fields.Char(related='aluno_id.nome_aluno', string='Nome do aluno')
+    state = fields.Selection(
+        [
+            ('pendente', 'Pendente'),
+            ('concluido', 'Concluído'),
+            ('falha', 'Falha'),
+        ],
+        string='Situação',
+        default='pendente',
+        required=True,
+        index=True,
+    )
+    attachment_id = fields.Many2one('ir.attachment', string='PDF', copy=False, ondelete='set null')
+    erro = fields.Text(string='Erro')
+
+    def _gerar_pdf(self):
+        """
+        Gera os PDFs das linhas numa única chamada do relatório e liga cada linha ao anexo que o
+        relatório grava por aluno. Sem divisão em blocos paralelos (geracad_render_bloco): o lote
+        precisa enxergar os anexos na própria transação. Se o bloco falhar, cada linha é gerada
+        sozinha, e uma falha afeta só a linha (savepoint).
+        """
+        report = self.env.ref('geracad_certificados.action_report_certificado').with_context(
+            geracad_render_bloco=True,
+        )
+        try:
+            with self.env.cr.savepoint():
+                report._render_qweb_pdf(self.mapped('aluno_id').ids)
+                self._vincular_anexos(report)
+            return
+        except Exception:
+            _logger.warning('Falha ao gerar o bloco de certificados; gerando aluno a aluno', exc_info=True)
+        for linha in self:
+            try:
+                with self.env.cr.savepoint():
+                    report._render_qweb_pdf(linha.aluno_id.ids)
+                    linha._vincular_anexos(report)
+            except Exception as e:
+                _logger.exception('Falha ao gerar certificado do aluno %s', linha.aluno_id.id)
+                linha.write({'state': 'falha', 'erro': str(e)})
+
+    def _vincular_anexos(self, report):
+        """Aponta cada linha para o PDF do aluno guardado pelo relatório (nome pela impressão digital)."""
+        for linha in self:
+            anexo = report.retrieve_attachment(linha.aluno_id)
+            if not anexo:
+                raise UserError(_('O PDF do certificado de %s não foi guardado.') % linha.nome_aluno)
+            linha.write({'state': 'concluido', 'attachment_id': anexo.id, 'erro': False})
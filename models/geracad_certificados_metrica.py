@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Métricas de desempenho dos relatórios e das rotas de verificação (instrumentação opcional).
+Ligada pelo parâmetro geracad_certificados.instrumentacao ou pela chave de contexto
+geracad_instrumentacao: "log" grava só a linha de log em JSON e os contadores do worker;
+"db" também grava uma linha por etapa neste modelo, para consulta (agrupar, pivot) e exportação.
+As medições são feitas por tools/instrumentacao.py.
+"""
+
+import json
+import os
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+from ..tools import instrumentacao
+
+MODOS_LOG = ('1', 'true', 'log', 'sim')
+RETENCAO_DIAS_PADRAO = 7
+
+
+class GeracadCertificadosMetrica(models.Model):
+    _name = 'geracad.certificados.metrica'
+    _description = 'Métrica de desempenho (certificados)'
+    _order = 'id desc'
+
+    operacao = fields.Char(string='Operação', required=True, index=True, readonly=True)
+    etapa = fields.Char(
+        string='Etapa',
+        index=True,
+        readonly=True,
+        help='"total" é a operação inteira; as demais etapas podem se sobrepor (aninhadas).',
+    )
+    chamadas = fields.Integer(string='Chamadas', readonly=True)
+    duracao_ms = fields.Float(string='Duração (ms)', digits=(16, 3), readonly=True)
+    bytes = fields.Integer(string='Bytes', readonly=True)
+    registros = fields.Integer(string='Registros', readonly=True, group_operator='max')
+    pid = fields.Integer(string='PID do worker', readonly=True, group_operator=False)
+    detalhes = fields.Text(string='Detalhes', readonly=True, help='Atributos da operação, em JSON.')
+
+    @api.model
+    def _get_modo_instrumentacao(self):
+        """'' (desligado), 'log' ou 'db': contexto geracad_instrumentacao > parâmetro de sistema."""
+        valor = self.env.context.get('geracad_instrumentacao')
+        if not valor:
+            valor = self.env['ir.config_parameter'].sudo().get_param('geracad_certificados.instrumentacao')
+        valor = str(valor or '').strip().lower()
+        if valor == 'db':
+            return 'db'
+        return 'log' if valor in MODOS_LOG else ''
+
+    @api.model
+    def _gravar(self, medicao, modo):
+        """Grava a medição encerrada (uma linha por etapa + "total") quando o modo é 'db'."""
+        if modo != 'db' or medicao is None:
+            return
+        atributos = dict(medicao.atributos)
+        registros = atributos.get('registros') or 0
+        comum = {
+            'operacao': medicao.operacao,
+            'registros': registros,
+            'pid': os.getpid(),
+        }
+        vals_list = [dict(
+            comum,
+            etapa='total',
+            chamadas=1,
+            duracao_ms=medicao.duracao * 1000,
+            bytes=atributos.get('bytes') or 0,
+            detalhes=json.dumps(atributos, sort_keys=True, default=str),
+        )]
+        for nome, (chamadas, duracao, tamanho, _maior) in medicao.etapas.items():
+            vals_list.append(dict(comum, etapa=nome, chamadas=chamadas, duracao_ms=duracao * 1000, bytes=tamanho))
+        self.sudo().create(vals_list)
+
+    @api.model
+    def get_contadores(self):
+        """Contadores agregados do worker atual (desde o início do processo ou do último zerar)."""
+        return {'pid': os.getpid(), 'contadores': instrumentacao.contadores()}
+
+    @api.model
+    def zerar_contadores(self):
+        instrumentacao.zerar_contadores()
+        return True
+
+    @api.model
+    def _cron_limpar_metricas(self):
+        """Remove métricas mais antigas que geracad_certificados.instrumentacao_retencao_dias."""
+        dias = int(
+            self.env['ir.config_parameter'].sudo().get_param(
+                'geracad_certificados.instrumentacao_retencao_dias', RETENCAO_DIAS_PADRAO,
+            )
+        )
+        limite = fields.Datetime.now() - timedelta(days=dias)
+        self.sudo().search([('create_date', '<', limite)]).unlink()
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Extensão de ir.actions.report para o relatório do certificado.
+O PDF fica guardado como anexo com nome derivado da impressão digital do certificado
+(ver get_certificado_fingerprint); ao gravar um novo, os anteriores do mesmo aluno são removidos.
+O motor de geração é escolhido por relatório (campo geracad_motor_pdf) ou pelo parâmetro
+geracad_certificados.motor_pdf: 'qweb' (QWeb + wkhtmltopdf) ou 'nativo' (ReportLab, só a frente).
+O motor nativo passa pelo mesmo cache de anexos: alunos com PDF guardado não são gerados de novo.
+Opcionalmente (geracad_certificados.render_tamanho_bloco > 0, desligado por padrão), impressões QWeb
+com muitos alunos são divididas em blocos gerados em threads, cada uma com seu cursor (no máximo
+geracad_certificados.render_threads ao mesmo tempo); os PDFs são unidos em ordem. O QWeb continua
+preso ao GIL: o ganho vem só de os processos wkhtmltopdf dos blocos rodarem ao mesmo tempo. Por isso
+o motor nativo (ReportLab, só Python) não é dividido. Cada bloco faz commit do próprio cursor (anexos e
+QR gravados fora da transação de quem imprime) e só enxerga dados já commitados: só vale a pena ligar
+onde se imprime o que já foi salvo (ex.: impressões grandes pelo menu de alunos já cadastrados).
+A fonte embutida do certificado vai ao wkhtmltopdf uma vez por execução (--user-style-sheet), e não
+em cada article do HTML.
+Com a instrumentação ligada (ver geracad.certificados.metrica), o certificado e a lista de entrega
+registram a duração de cada etapa e o tamanho do HTML enviado ao wkhtmltopdf.
+"""
+
+import io
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from odoo import api, fields, models
+from odoo.tools.pdf import merge_pdf
+from odoo.tools.safe_eval import safe_eval
+
+from ..tools import instrumentacao
+
+_logger = logging.getLogger(__name__)
+
+REPORT_CERTIFICADO = 'geracad_certificados.report_certificado_template'
+REPORT_LISTA_ENTREGA = 'geracad_certificados.report_lista_entrega_certificado_template'
+REPORTS_INSTRUMENTADOS = (REPORT_CERTIFICADO, REPORT_LISTA_ENTREGA)
+PREFIXO_ANEXO_CERTIFICADO = 'Certificado-'
+# 0 = sem divisão em blocos paralelos (opt-in pelo parâmetro geracad_certificados.render_tamanho_bloco)
+TAMANHO_BLOCO_PADRAO = 0
+
+
+class IrActionsReport(models.Model):
+    _inherit = 'ir.actions.report'
+
+    geracad_motor_pdf = fields.Selection(
+        [
+            ('qweb', 'QWeb + wkhtmltopdf'),
+            ('nativo', 'Nativo (ReportLab)'),
+        ],
+        string='Motor do certificado',
+        default='qweb',
+        help='Motor usado no certificado Geracad. "Nativo" compõe a frente diretamente em PDF '
+             '(fundo reaproveitado, campos em posições fixas) e gera o verso uma vez por curso. '
+             'O parâmetro de sistema geracad_certificados.motor_pdf, se definido, tem prioridade.',
+    )
+
+    def _get_motor_certificado(self):
+        """Motor efetivo do certificado: parâmetro de sistema > campo do relatório."""
+        self.ensure_one()
+        motor = self.env['ir.config_parameter'].sudo().get_param('geracad_certificados.motor_pdf')
+        return motor or self.geracad_motor_pdf or 'qweb'
+
+    def _render_qweb_pdf(self, res_ids=None, data=None):
+        if self.report_name in REPORTS_INSTRUMENTADOS and instrumentacao.atual() is None:
+            Metrica = self.env['geracad.certificados.metrica']
+            modo = Metrica._get_modo_instrumentacao()
+            if modo:
+                registros = 1 if isinstance(res_ids, int) else len(res_ids or [])
+                with instrumentacao.operacao(self.report_name, registros=registros) as medicao:
+                    pdf_content, fmt = self._render_qweb_pdf_geracad(res_ids, data)
+                    medicao.anotar(bytes=len(pdf_content or b''))
+                Metrica._gravar(medicao, modo)
+                return pdf_content, fmt
+        return self._render_qweb_pdf_geracad(res_ids, data)
+
+    def _render_qweb_pdf_geracad(self, res_ids=None, data=None):
+        if self.report_name == REPORT_CERTIFICADO and res_ids:
+            if isinstance(res_ids, int):
+                res_ids = [res_ids]
+            blocos = self._get_blocos_render_paralelo(res_ids)
+            if len(blocos) > 1:
+                with instrumentacao.etapa('blocos_paralelos'):
+                    return self._render_certificados_paralelo(blocos, data), 'pdf'
+            if self._get_motor_certificado() == 'nativo':
+                with instrumentacao.etapa('motor_nativo'):
+                    return self._render_certificados_nativo(res_ids), 'pdf'
+        return super()._render_qweb_pdf(res_ids=res_ids, data=data)
+
+    def _render_certificados_nativo(self, res_ids):
+        """
+        Motor nativo com o fluxo de anexos do relatório: alunos com PDF guardado (attachment_use)
+        são lidos do anexo; os demais são compostos pelo ReportLab e guardados um a um
+        (_postprocess_pdf_report, que também remove os obsoletos). Os PDFs são unidos na ordem de res_ids.
+        """
+        self_sudo = self.sudo()
+        alunos = self.env[self_sudo.model].browse(res_ids)
+        pdfs = {}
+        gerar = alunos.browse()
+        for aluno in alunos:
+            anexo = self_sudo.attachment and self_sudo.attachment_use and self_sudo.retrieve_attachment(aluno)
+            if anexo:
+                pdfs[aluno.id] = anexo.raw
+            else:
+                gerar |= aluno
+        if gerar:
+            novos = self.env['report.%s' % REPORT_CERTIFICADO]._render_pdf_nativo(gerar.ids)
+            for aluno in gerar:
+                buffer = io.BytesIO(novos[aluno.id])
+                if self_sudo.attachment:
+                    buffer = self_sudo._postprocess_pdf_report(aluno, buffer) or buffer
+                pdfs[aluno.id] = buffer.getvalue()
+        if len(alunos) == 1:
+            return pdfs[alunos.id]
+        return merge_pdf([pdfs[aluno.id] for aluno in alunos])
+
+    def _render_qweb_html(self, docids, data=None):
+        with instrumentacao.etapa('qweb_html') as etapa:
+            html, fmt = super()._render_qweb_html(docids, data=data)
+            etapa.bytes = len(html or b'')
+        return html, fmt
+
+    @api.model
+    def _build_wkhtmltopdf_args(self, paperformat_id, landscape, specific_paperformat_args=None,
+                                set_viewport_size=False):
+        args = super()._build_wkhtmltopdf_args(
+            paperformat_id,
+            landscape,
+            specific_paperformat_args=specific_paperformat_args,
+            set_viewport_size=set_viewport_size,
+        )
+        if len(self) == 1 and self.report_name == REPORT_CERTIFICADO:
+            fonte_css = self.env['geracad.certificados.curso.aluno']._get_certificado_fonte_css_arquivo()
+            if fonte_css:
+                args.extend(['--user-style-sheet', fonte_css])
+        return args
+
+    @api.model
+    def _run_wkhtmltopdf(self, bodies, header=None, footer=None, landscape=False,
+                         specific_paperformat_args=None, set_viewport_size=False):
+        with instrumentacao.etapa('wkhtmltopdf') as etapa:
+            etapa.bytes = sum(len(body) for body in bodies) + len(header or b'') + len(footer or b'')
+            return super()._run_wkhtmltopdf(
+                bodies,
+                header=header,
+                footer=footer,
+                landscape=landscape,
+                specific_paperformat_args=specific_paperformat_args,
+                set_viewport_size=set_viewport_size,
+            )
+
+    def _get_blocos_render_paralelo(self, res_ids):
+        """
+        Divide res_ids em blocos de geracad_certificados.render_tamanho_bloco (padrão 0: sem divisão).
+        Sem divisão no motor nativo (sem subprocesso, as threads não ganhariam nada com o GIL) e
+        com geracad_render_bloco no contexto (dentro de um bloco ou com dados ainda não commitados).
+        """
+        if self.env.context.get('geracad_render_bloco') or self._get_motor_certificado() == 'nativo':
+            return [res_ids]
+        tamanho = int(
+            self.env['ir.config_parameter'].sudo().get_param(
+                'geracad_certificados.render_tamanho_bloco', TAMANHO_BLOCO_PADRAO,
+            )
+        )
+        if tamanho <= 0 or len(res_ids) <= tamanho:
+            return [res_ids]
+        return [res_ids[i:i + tamanho] for i in range(0, len(res_ids), tamanho)]
+
+    def _render_certificados_paralelo(self, blocos, data=None):
+        """
+        Gera cada bloco em uma thread com cursor próprio (o ORM não é compartilhado entre threads)
+        e une os PDFs na ordem dos blocos. Cada bloco passa pelo fluxo normal do relatório,
+        inclusive o cache de anexos por aluno. Os dados precisam estar commitados, pois as
+        threads não enxergam a transação corrente. O paralelismo real é o dos processos wkhtmltopdf.
+        """
+        threads = int(
+            self.env['ir.config_parameter'].sudo().get_param('geracad_certificados.render_threads', 0)
+        ) or min(4, os.cpu_count() or 1)
+        uid = self.env.uid
+        context = dict(self.env.context, geracad_render_bloco=True)
+        report_id = self.id
+        registry = self.pool
+
+        def render_bloco(ids):
+            with api.Environment.manage(), registry.cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                pdf_content, _fmt = env['ir.actions.report'].browse(report_id)._render_qweb_pdf(ids, data=data)
+                return pdf_content
+
+        inicio = time.time()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            pdfs = list(executor.map(render_bloco, blocos))
+        _logger.info(
+            'Certificados: %s blocos gerados em paralelo (%s threads) em %.2fs',
+            len(blocos), threads, time.time() - inicio,
+        )
+        return merge_pdf(pdfs)
+
+    def _postprocess_pdf_report(self, record, buffer):
+        buffer = super()._postprocess_pdf_report(record, buffer)
+        if self.report_name == REPORT_CERTIFICADO and self.attachment:
+            self._remover_certificados_obsoletos(record)
+        return buffer
+
+    def _remover_certificados_obsoletos(self, record):
+        """Remove PDFs do certificado gravados com impressão digital antiga (dados já alterados)."""
+        atual = self._get_nome_anexo_certificado(record)
+        obsoletos = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self.model),
+            ('res_id', '=', record.id),
+            ('name', '=like', PREFIXO_ANEXO_CERTIFICADO + '%.pdf'),
+            ('name', '!=', atual),
+        ])
+        obsoletos.unlink()
+
+    def _get_nome_anexo_certificado(self, record):
+        """Nome do anexo atual, avaliado pela mesma expressão do campo attachment do relatório."""
+        return safe_eval(self.attachment, {'object': record, 'time': time})
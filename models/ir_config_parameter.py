@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+Extensão de ir.config_parameter: ao ligar geracad_certificados.qr_assinado, cria a primeira chave
+do QR assinado (se ainda não houver), uma vez, na mesma transação; a impressão só lê a chave.
+"""
+
+from odoo import api, models
+from odoo.tools import str2bool
+
+PARAMETRO_QR_ASSINADO = 'geracad_certificados.qr_assinado'
+
+
+class IrConfigParameter(models.Model):
+    _inherit = 'ir.config_parameter'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._garantir_chave_qr_assinado()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'value' in vals or 'key' in vals:
+            self._garantir_chave_qr_assinado()
+        return res
+
+    def _garantir_chave_qr_assinado(self):
+        if any(p.key == PARAMETRO_QR_ASSINADO and str2bool(p.value or 'False', False) for p in self):
+            self.env['geracad.certificados.curso.aluno'].sudo()._garantir_chave_qr()
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Relatório do certificado: pré-calcula os valores compartilhados antes do QWeb.
+Assinaturas, período e verso são calculados uma vez por curso; fundo, selo e logo
+uma vez por impressão. O template só consome os valores prontos por aluno.
+Também implementa o motor nativo (ReportLab), que usa os mesmos valores; o PDF do verso fica
+em cache no worker pela impressão digital do verso (conteúdo programático, template e fontes).
+"""
+
+import base64
+import copy
+import hashlib
+import io
+import json
+
+from odoo import api, models
+
+from ..tools import instrumentacao
+from ..tools.cache import CacheLRU
+
+# PDF do verso (QWeb + wkhtmltopdf) por impressão digital do verso; compartilhado no worker
+_CACHE_VERSOS = CacheLRU(tamanho_max=64, bytes_max=32 * 1024 * 1024)
+
+
+def _data_uri_bytes(uri):
+    """Bytes da imagem de um data URI base64 (ou None)."""
+    if not uri:
+        return None
+    idx = uri.find('base64,')
+    return base64.b64decode(uri[idx + 7:]) if idx >= 0 else None
+
+
+class ReportCertificado(models.AbstractModel):
+    _name = 'report.geracad_certificados.report_certificado_template'
+    _description = 'Certificado do curso (valores pré-calculados por curso)'
+
+    @api.model
+    @instrumentacao.medir_etapa('valores_relatorio')
+    def _get_report_values(self, docids, data=None):
+        docs = self.env['geracad.certificados.curso.aluno'].browse(docids)
+        cursos_ctx = {curso.id: curso._get_certificado_contexto() for curso in docs.mapped('curso_id')}
+        primeiro = docs[:1]
+        return {
+            'doc_ids': docids,
+            'doc_model': 'geracad.certificados.curso.aluno',
+            'docs': docs,
+            'cursos_ctx': cursos_ctx,
+            'fundo_uri': primeiro._get_certificado_fundo_data_uri(),
+            'selo_uri': primeiro._get_selo_data_uri(),
+            'company_logo_uri': primeiro.get_company_logo_data_uri() if primeiro else '',
+            # No PDF a fonte vai pelo --user-style-sheet (ir.actions.report); aqui só na visualização HTML
+            'fonte_css': docs.get_certificado_fonte_css() if (data or {}).get('report_type') != 'pdf' else '',
+        }
+
+    @api.model
+    def _get_linhas_assinaturas(self, aluno, c):
+        """
+        Blocos de assinatura da frente no motor nativo, na mesma ordem e com os mesmos textos
+        do template: lista de (imagem PNG ou None, [nome, linhas de cargo...]).
+        """
+        curso = aluno.curso_id
+        participante = (None, [aluno.nome_aluno]
+                        + (['Cat.: %s' % aluno.aluno_categoria] if aluno.aluno_categoria else [])
+                        + (['Registro Nº: %s' % aluno.aluno_registro] if aluno.aluno_registro else [])
+                        + (['RENACH: %s' % aluno.aluno_renach] if aluno.aluno_renach else [])
+                        + ['Participante'])
+        instrutor = ([curso.instrutor_id.name]
+                     + ([curso.instrutor_cargo_funcao] if curso.instrutor_cargo_funcao else [])
+                     + (['Registro Nº %s' % curso.instrutor_registro] if curso.instrutor_registro else [])
+                     + (['RENACH: %s' % curso.instrutor_renach] if curso.instrutor_renach else []))
+        responsavel = (([curso.responsavel_tecnico_cargo_funcao] if curso.responsavel_tecnico_cargo_funcao else [])
+                       + (['CREA: %s' % curso.responsavel_tecnico_crea] if curso.responsavel_tecnico_crea else []))
+        if c['mesmo_instrutor_resp']:
+            return [
+                (_data_uri_bytes(c['assinatura_unica_uri']), instrutor + responsavel + ['Instrutor e Responsável Técnico']),
+                participante,
+            ]
+        blocos = [
+            (_data_uri_bytes(c['assinatura_instrutor_uri']), instrutor + ['Instrutor']),
+            participante,
+        ]
+        if curso.responsavel_tecnico_id:
+            blocos.append((
+                _data_uri_bytes(c['assinatura_responsavel_tecnico_uri']),
+                [curso.responsavel_tecnico_id.name] + responsavel + ['Responsável técnico'],
+            ))
+        return blocos
+
+    @api.model
+    def _get_verso_pdf(self, curso):
+        """
+        PDF do verso do curso. Gerado pelo QWeb + wkhtmltopdf só quando a impressão digital do verso
+        (banco, conteúdo programático, versão do template e arquivos estáticos) não está no cache.
+        """
+        Aluno = self.env['geracad.certificados.curso.aluno']
+        chave = hashlib.sha1(json.dumps([
+            self.env.cr.dbname,
+            curso.conteudo_programatico,
+            Aluno._get_template_versao(),
+            Aluno._get_versao_estaticos(),
+        ], default=str).encode('utf-8')).hexdigest()
+        pdf = _CACHE_VERSOS.get(chave)
+        if pdf is None:
+            report_verso = self.env.ref('geracad_certificados.action_report_certificado_verso')
+            with instrumentacao.etapa('verso'):
+                pdf, _fmt = report_verso._render_qweb_pdf(curso.ids)
+            _CACHE_VERSOS.set(chave, pdf)
+        return pdf
+
+    @api.model
+    def _render_pdf_nativo(self, docids):
+        """
+        Motor nativo: frentes compostas com ReportLab (tools/certificado_pdf.py) num único PDF
+        e verso de cada curso (_get_verso_pdf) após cada frente.
+        :return: dict {aluno_id: PDF do aluno (frente e verso)}, para o relatório guardar um anexo por aluno
+        """
+        from PyPDF2 import PdfFileReader, PdfFileWriter
+        from ..tools.certificado_pdf import CompositorCertificado
+
+        valores = self._get_report_values(docids)
+        docs = valores['docs']
+        compositor = CompositorCertificado(
+            fundo_png=_data_uri_bytes(valores['fundo_uri']),
+            selo_png=_data_uri_bytes(valores['selo_uri']),
+        )
+        logo = _data_uri_bytes(valores['company_logo_uri'])
+        company_nome = self.env.company.name
+        for aluno in docs:
+            c = valores['cursos_ctx'][aluno.curso_id.id]
+            with instrumentacao.etapa('qrcode'):
+                qrcode = aluno.get_qrcode_base64()
+            compositor.adicionar_frente({
+                'nome_aluno': aluno.nome_aluno,
+                'curso_nome': aluno.curso_id.name,
+                'carga_horaria': aluno.curso_id.carga_horaria,
+                'periodo': c['periodo'],
+                'assinaturas': self._get_linhas_assinaturas(aluno, c),
+                'qrcode_png': base64.b64decode(qrcode) if qrcode else None,
+                'token': aluno.token,
+                'logo_png': logo,
+                'company_nome': company_nome,
+            })
+        frentes = PdfFileReader(io.BytesIO(compositor.finalizar()), strict=False)
+
+        versos = {}
+        for curso in docs.mapped('curso_id'):
+            leitor = PdfFileReader(io.BytesIO(self._get_verso_pdf(curso)), strict=False)
+            versos[curso.id] = [leitor.getPage(i) for i in range(leitor.getNumPages())]
+
+        pdfs = {}
+        for i, aluno in enumerate(docs):
+            writer = PdfFileWriter()
+            writer.addPage(frentes.getPage(i))
+            for pagina in versos[aluno.curso_id.id]:
+                # cópia rasa: nova página no PDF, mas conteúdo e recursos do verso compartilhados
+                writer.addPage(copy.copy(pagina))
+            out = io.BytesIO()
+            writer.write(out)
+            pdfs[aluno.id] = out.getvalue()
+        return pdfs
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Relatório da lista de entrega: linhas lidas numa consulta para todos os cursos e divididas em
+páginas de tamanho fixo (geracad_certificados.lista_entrega_linhas_pagina). O template não usa
+web.external_layout: o cabeçalho é um bloco simples na própria página, então cursos de um mês
+inteiro vão para o wkhtmltopdf num único documento, sem cabeçalho/rodapé separados por curso.
+"""
+
+from odoo import api, models
+
+from ..tools import instrumentacao, lista_entrega
+
+
+class ReportListaEntrega(models.AbstractModel):
+    _name = 'report.geracad_certificados.report_lista_entrega_certificado_template'
+    _description = 'Lista de entrega de certificados (páginas de tamanho fixo)'
+
+    @api.model
+    @instrumentacao.medir_etapa('valores_relatorio')
+    def _get_report_values(self, docids, data=None):
+        docs = self.env['geracad.certificados.curso'].browse(docids)
+        linhas_por_pagina = self.env['ir.config_parameter'].sudo().get_param(
+            'geracad_certificados.lista_entrega_linhas_pagina', lista_entrega.LINHAS_POR_PAGINA_PADRAO,
+        )
+        por_curso = docs._get_lista_entrega_linhas_por_curso()
+        paginas = []
+        for curso in docs:
+            blocos = lista_entrega.paginar(por_curso[curso.id], linhas_por_pagina)
+            periodo = curso.get_periodo_display()
+            for numero, bloco in enumerate(blocos, 1):
+                paginas.append({
+                    'curso': curso.name,
+                    'periodo': periodo,
+                    'linhas': [(linha[2], linha[3]) for linha in bloco],
+                    'pagina': numero,
+                    'total_paginas': len(blocos),
+                })
+        return {
+            'doc_ids': docids,
+            'doc_model': 'geracad.certificados.curso',
+            'docs': docs,
+            'paginas': paginas,
+            **self.env.company._get_certificado_company_data(),
+        }
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Extensão de res.company: dados da empresa exibidos nas páginas públicas de verificação.
+Os dados ficam em ormcache (por empresa) e são invalidados em todos os workers quando
+a empresa ou o parceiro da empresa é alterado.
+O logo é usado em variantes reduzidas (certificado e página de verificação), calculadas uma
+vez por worker e cacheadas pelo hash do logo.
+"""
+
+import base64
+import hashlib
+
+from odoo import models, tools
+
+from ..tools import imagem
+from ..tools.cache import CacheLRU
+
+# (hash do logo, largura, altura) -> bytes da PNG reduzida
+_CACHE_LOGOS = CacheLRU(tamanho_max=64)
+
+
+class ResCompany(models.Model):
+    _inherit = 'res.company'
+
+    @tools.ormcache('self.id')
+    def _get_certificado_company_data(self):
+        """
+        Retorna dict com dados da empresa (nome, CNPJ, endereço, telefone, URL do logo) para os templates.
+        O dict é compartilhado pelo cache: não alterar, copiar antes ({**dados}).
+        'company_versao' muda sempre que algum dado (inclusive o logo) muda; usado em ETags.
+        """
+        company = self.sudo()
+        partner = company.partner_id or company
+        endereco_partes = []
+        if getattr(partner, 'street', None):
+            endereco_partes.append(partner.street)
+        if getattr(partner, 'street2', None):
+            endereco_partes.append(partner.street2)
+        if getattr(partner, 'city', None):
+            cidade_uf = partner.city
+            if getattr(partner, 'state_id', None) and partner.state_id:
+                cidade_uf += ' - %s' % (partner.state_id.code or partner.state_id.name)
+            if getattr(partner, 'zip', None) and partner.zip:
+                cidade_uf += ' - CEP %s' % partner.zip
+            endereco_partes.append(cidade_uf)
+        if getattr(partner, 'country_id', None) and partner.country_id:
+            endereco_partes.append(partner.country_id.name)
+        endereco_completo = ', '.join(endereco_partes) if endereco_partes else ''
+        cnpj = company.vat or getattr(company, 'l10n_br_cnpj_cpf', None) or ''
+        if not cnpj and company.partner_id:
+            cnpj = company.partner_id.vat or getattr(company.partner_id, 'l10n_br_cnpj_cpf', None) or ''
+        logo_hash = hashlib.sha1(company.logo).hexdigest() if company.logo else ''
+        dados = {
+            'company_nome': company.name,
+            'company_cnpj': cnpj,
+            'endereco_completo': endereco_completo,
+            'company_telefone': company.phone or getattr(company, 'mobile', None) or (company.partner_id and (company.partner_id.phone or company.partner_id.mobile)) or '',
+            'company_logo_hash': logo_hash,
+            'company_logo_url': '/certificados/logo/%s?v=%s-%s' % (
+                company.id, logo_hash[:12], imagem.LOGO_VERIFICACAO_MAX[1],
+            ) if logo_hash else '',
+        }
+        dados['company_versao'] = hashlib.sha1(repr(sorted(dados.items())).encode('utf-8')).hexdigest()
+        return dados
+
+    def _get_logo_variante_png(self, largura_max, altura_max):
+        """
+        Logo reduzido para caber em largura_max x altura_max, com paleta (bytes da PNG; b'' sem logo).
+        A chave do cache é o hash do logo (dados em ormcache), então um logo novo gera outra variante.
+        """
+        self.ensure_one()
+        logo_hash = self._get_certificado_company_data()['company_logo_hash']
+        if not logo_hash:
+            return b''
+        chave = (logo_hash, largura_max, altura_max)
+        png = _CACHE_LOGOS.get(chave)
+        if png is None:
+            raw = base64.b64decode(self.sudo().logo)
+            try:
+                png = imagem.variante_png(raw, largura_max, altura_max, imagem.CORES_LOGO)
+            except Exception:
+                png = raw
+            _CACHE_LOGOS.set(chave, png)
+        return png
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.clear_caches()
+        return res
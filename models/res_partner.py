@@ -2,10 +2,17 @@
 """
 Extensão de res.partner para adicionar assinatura do professor.
 Usada no formulário de professores e nos certificados.
+Alterações no parceiro de uma empresa invalidam o cache dos dados da empresa (res.company).
 """
 
 from odoo import fields, models
 
+# Campos do parceiro exibidos em res.company._get_certificado_company_data
+CAMPOS_DADOS_EMPRESA = {
+    'name', 'street', 'street2', 'city', 'state_id', 'zip', 'country_id',
+    'vat', 'l10n_br_cnpj_cpf', 'phone', 'mobile',
+}
+
 
 class ResPartner(models.Model):
     _inherit = 'res.partner'
@@ -14,3 +21,10 @@ class ResPartner(models.Model):
         string='Assinatura do professor',
         help='Assinatura exibida em certificados quando o parceiro atua como instrutor ou responsável técnico.',
     )
+
+    def write(self, vals):
+        res = super().write(vals)
+        if CAMPOS_DADOS_EMPRESA.intersection(vals) and self.env['res.company'].sudo().search_count(
+                [('partner_id', 'in', self.ids)]):
+            self.env['res.company'].clear_caches()
+        return res
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+Funções auxiliares sem dependência do ORM (imagens, caches).
+Podem ser importadas pelos benchmarks sem subir o Odoo.
+"""
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Carga assinada (HMAC-SHA256) da URL do QR code: /certificados/verificar/<token>?s=<carga>.
+A carga leva o id da chave (rotação), o curso, a data de emissão e um hash do nome do aluno;
+o MAC cobre também o token. Formato (campos separados por ponto, base64url sem padding):
+
+    <kid>.<curso_id base36>.<AAAAMMDD>.<hash do nome, 6 bytes>.<MAC, 12 bytes>
+
+A verificação só usa as chaves (em memória): carga forjada ou corrompida é recusada sem banco.
+"""
+
+import base64
+import hashlib
+import hmac
+import re
+
+RE_KID = re.compile(r'^[A-Za-z0-9_-]{1,16}$')
+TAMANHO_HASH_NOME = 6
+TAMANHO_MAC = 12
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _base36(numero):
+    digitos = '0123456789abcdefghijklmnopqrstuvwxyz'
+    numero = int(numero or 0)
+    if numero <= 0:
+        return '0'
+    saida = ''
+    while numero:
+        numero, resto = divmod(numero, 36)
+        saida = digitos[resto] + saida
+    return saida
+
+
+def hash_nome(nome):
+    """Hash curto do nome do aluno (espaços normalizados, maiúsculas)."""
+    normalizado = ' '.join((nome or '').split()).upper()
+    return _b64(hashlib.sha256(normalizado.encode('utf-8')).digest()[:TAMANHO_HASH_NOME])
+
+
+def _mac(chave, kid, token, curso, data, nome_h):
+    mensagem = '|'.join((kid, token or '', curso, data, nome_h)).encode('utf-8')
+    return _b64(hmac.new(chave.encode('utf-8'), mensagem, hashlib.sha256).digest()[:TAMANHO_MAC])
+
+
+def assinar(chave, kid, token, nome_aluno, curso_id, data_emissao):
+    """
+    Carga assinada para a URL do QR.
+    :param data_emissao: date (ou None)
+    """
+    curso = _base36(curso_id)
+    data = data_emissao.strftime('%Y%m%d') if data_emissao else '0'
+    nome_h = hash_nome(nome_aluno)
+    return '.'.join((kid, curso, data, nome_h, _mac(chave, kid, token, curso, data, nome_h)))
+
+
+def ler_kid(carga):
+    """Id da chave da carga (ou None se a carga não tem o formato esperado)."""
+    partes = (carga or '').split('.')
+    if len(partes) != 5 or not RE_KID.match(partes[0]):
+        return None
+    return partes[0]
+
+
+def verificar(chave, token, carga):
+    """
+    True se a carga foi assinada com `chave` para `token`.
+    A comparação do MAC é em tempo constante.
+    """
+    partes = (carga or '').split('.')
+    if len(partes) != 5:
+        return False
+    kid, curso, data, nome_h, mac = partes
+    # Em bytes: compare_digest recusa (TypeError) str com caracteres fora do ASCII
+    return hmac.compare_digest(_mac(chave, kid, token, curso, data, nome_h).encode('ascii'), mac.encode('utf-8'))
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Cache LRU em memória (por processo/worker) com contadores de acertos e faltas.
+Limitado por quantidade de entradas e, opcionalmente, pelo tamanho total dos valores
+(bytes_max; str/bytes pelo len, tuplas pela soma dos elementos str/bytes).
+Thread-safe: o Odoo em modo threaded atende várias requisições no mesmo processo.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+def tamanho_valor(valor):
+    """Tamanho aproximado do valor em bytes (só str/bytes, diretos ou dentro de tupla/lista)."""
+    if isinstance(valor, (str, bytes, bytearray)):
+        return len(valor)
+    if isinstance(valor, (tuple, list)):
+        return sum(len(v) for v in valor if isinstance(v, (str, bytes, bytearray)))
+    return 0
+
+
+class CacheLRU(object):
+    """
+    Dicionário limitado a `tamanho_max` entradas e, se `bytes_max` for informado, a `bytes_max`
+    no total; descarta as menos usadas. Um valor maior que bytes_max sozinho não é guardado.
+    """
+
+    def __init__(self, tamanho_max=256, bytes_max=None):
+        self.tamanho_max = tamanho_max
+        self.bytes_max = bytes_max
+        self._dados = OrderedDict()
+        self._tamanhos = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def get(self, chave, default=None):
+        with self._lock:
+            try:
+                valor = self._dados[chave]
+            except KeyError:
+                self.faltas += 1
+                return default
+            self._dados.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def set(self, chave, valor):
+        with self._lock:
+            self._remover(chave)
+            tamanho = tamanho_valor(valor) if self.bytes_max else 0
+            if self.bytes_max and tamanho > self.bytes_max:
+                return
+            self._dados[chave] = valor
+            self._tamanhos[chave] = tamanho
+            self._bytes += tamanho
+            while len(self._dados) > self.tamanho_max or (self.bytes_max and self._bytes > self.bytes_max):
+                self._remover(next(iter(self._dados)))
+
+    def _remover(self, chave):
+        if chave in self._dados:
+            del self._dados[chave]
+            self._bytes -= self._tamanhos.pop(chave, 0)
+            return True
+        return False
+
+    def pop(self, chave, default=None):
+        with self._lock:
+            valor = self._dados.get(chave, default)
+            self._remover(chave)
+            return valor
+
+    def clear(self):
+        with self._lock:
+            self._dados.clear()
+            self._tamanhos.clear()
+            self._bytes = 0
+            self.acertos = 0
+            self.faltas = 0
+
+    def __len__(self):
+        return len(self._dados)
+
+    def stats(self):
+        """Retorna dict com tamanho atual, limites e contadores de acertos e faltas."""
+        with self._lock:
+            return {
+                'tamanho': len(self._dados),
+                'tamanho_max': self.tamanho_max,
+                'bytes': self._bytes,
+                'bytes_max': self.bytes_max,
+                'acertos': self.acertos,
+                'faltas': self.faltas,
+            }
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Compositor nativo da frente do certificado (ReportLab), alternativa ao QWeb + wkhtmltopdf.
+A frente tem layout fixo: o fundo entra uma única vez no PDF como form XObject e é reaproveitado
+em todas as páginas; nome, textos, assinaturas, QR, selo e logo são desenhados em coordenadas fixas
+(A4 paisagem, em pontos). Imagens repetidas (assinaturas, logo, selo) também são embutidas uma vez.
+"""
+
+import io
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_JUSTIFY
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas as rl_canvas
+from reportlab.platypus import Paragraph
+
+LARGURA, ALTURA = landscape(A4)
+
+FONTE = 'Times-Roman'
+FONTE_NEGRITO = 'Times-Bold'
+
+COR_TEXTO = colors.HexColor('#1a1a1a')
+COR_NOME = colors.HexColor('#1e3a5f')
+COR_SECUNDARIA = colors.HexColor('#555555')
+COR_PARAGRAFO = colors.HexColor('#333333')
+
+ESTILO_PARAGRAFO = ParagraphStyle(
+    'paragrafo_treinamento',
+    fontName=FONTE,
+    fontSize=15,
+    leading=24,
+    textColor=COR_PARAGRAFO,
+    alignment=TA_JUSTIFY,
+)
+
+
+def _escape(texto):
+    return (texto or '').replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+class CompositorCertificado(object):
+    """
+    Desenha as frentes de vários certificados num único PDF (uma página por aluno).
+    Uso: compositor = CompositorCertificado(fundo, selo); compositor.adicionar_frente(dados) ...;
+    pdf = compositor.finalizar().
+    """
+
+    def __init__(self, fundo_png=None, selo_png=None):
+        self._buffer = io.BytesIO()
+        self._canvas = rl_canvas.Canvas(self._buffer, pagesize=(LARGURA, ALTURA), pageCompression=1)
+        self._imagens = {}
+        self._tem_fundo = bool(fundo_png)
+        if fundo_png:
+            self._canvas.beginForm('fundo')
+            self._canvas.drawImage(self._imagem(fundo_png), 0, 0, LARGURA, ALTURA)
+            self._canvas.endForm()
+        self._selo = selo_png
+
+    def _imagem(self, data):
+        """ImageReader por conteúdo (o mesmo objeto é reaproveitado entre páginas)."""
+        leitor = self._imagens.get(data)
+        if leitor is None:
+            leitor = self._imagens[data] = ImageReader(io.BytesIO(data))
+        return leitor
+
+    def _desenhar_imagem_caixa(self, data, x_centro, y_base, largura_max, altura_max):
+        """Desenha a imagem centrada em x_centro, apoiada em y_base, cabendo na caixa."""
+        leitor = self._imagem(data)
+        largura, altura = leitor.getSize()
+        escala = min(largura_max / float(largura), altura_max / float(altura))
+        w, h = largura * escala, altura * escala
+        self._canvas.drawImage(leitor, x_centro - w / 2, y_base, w, h, mask='auto')
+
+    def _texto_centro(self, texto, x, y, fonte, tamanho, cor):
+        c = self._canvas
+        c.setFont(fonte, tamanho)
+        c.setFillColor(cor)
+        c.drawCentredString(x, y, texto or '')
+
+    def _desenhar_assinatura(self, x_centro, imagem, linhas):
+        """Bloco de assinatura: imagem, linha e textos (nome em maiúsculas + linhas de cargo)."""
+        c = self._canvas
+        y_linha = 150
+        if imagem:
+            self._desenhar_imagem_caixa(imagem, x_centro, y_linha + 4, 150, 62)
+        c.setStrokeColor(COR_TEXTO)
+        c.setLineWidth(0.7)
+        c.line(x_centro - 80, y_linha, x_centro + 80, y_linha)
+        y = y_linha - 11
+        for i, texto in enumerate(linhas):
+            if i == 0:
+                self._texto_centro((texto or '').upper(), x_centro, y, FONTE, 8.5, COR_TEXTO)
+            else:
+                self._texto_centro(texto, x_centro, y, FONTE, 7.5, COR_SECUNDARIA)
+            y -= 10
+
+    def adicionar_frente(self, dados):
+        """
+        Adiciona uma página de frente.
+        :param dados: dict com nome_aluno, curso_nome, carga_horaria, periodo, assinaturas
+            (lista de (imagem_png_ou_None, [linhas de texto])), qrcode_png, token, logo_png, company_nome
+        """
+        c = self._canvas
+        if self._tem_fundo:
+            c.doForm('fundo')
+        centro = LARGURA / 2
+        self._texto_centro('CERTIFICADO', centro, ALTURA - 105, FONTE_NEGRITO, 40, COR_TEXTO)
+        self._texto_centro('Certificamos que, para os devidos fins,', centro, ALTURA - 170, FONTE, 22, COR_PARAGRAFO)
+        self._texto_centro((dados.get('nome_aluno') or '').upper(), centro, ALTURA - 205, FONTE_NEGRITO, 22, COR_NOME)
+
+        texto = 'concluiu o treinamento <b>%s</b> com carga horária de <b>%s horas</b> no período de <b>%s</b>.' % (
+            _escape(dados.get('curso_nome')), dados.get('carga_horaria') or 0, _escape(dados.get('periodo')),
+        )
+        paragrafo = Paragraph(texto, ESTILO_PARAGRAFO)
+        largura_paragrafo = LARGURA * 0.80
+        _w, h = paragrafo.wrap(largura_paragrafo, 120)
+        paragrafo.drawOn(c, (LARGURA - largura_paragrafo) / 2, ALTURA - 235 - h)
+
+        assinaturas = dados.get('assinaturas') or []
+        if assinaturas:
+            espaco = 210
+            x0 = centro - espaco * (len(assinaturas) - 1) / 2.0
+            for i, (imagem, linhas) in enumerate(assinaturas):
+                self._desenhar_assinatura(x0 + i * espaco, imagem, linhas)
+
+        if dados.get('qrcode_png'):
+            self._desenhar_imagem_caixa(dados['qrcode_png'], centro, 30, 48, 48)
+            self._texto_centro('Verificação de autenticidade', centro, 21, FONTE, 7, COR_SECUNDARIA)
+            self._texto_centro(dados.get('token') or '', centro, 12, FONTE, 7, COR_SECUNDARIA)
+
+        if self._selo:
+            self._desenhar_imagem_caixa(self._selo, 95, 35, 72, 90)
+
+        if dados.get('logo_png'):
+            self._desenhar_imagem_caixa(dados['logo_png'], LARGURA - 140, 35, 144, 72)
+        elif dados.get('company_nome'):
+            self._texto_centro(dados['company_nome'], LARGURA - 140, 60, FONTE_NEGRITO, 11, COR_NOME)
+        c.showPage()
+
+    def finalizar(self):
+        """Fecha o documento e retorna os bytes do PDF."""
+        self._canvas.save()
+        return self._buffer.getvalue()
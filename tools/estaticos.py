@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Cache por processo dos arquivos de static/ embutidos como data URI no certificado.
+Cada arquivo é lido e codificado uma vez por worker; o mtime é reconferido no máximo
+a cada INTERVALO_VERIFICACAO segundos (arquivo ausente também fica cacheado).
+Imagens PNG podem ter variantes reduzidas (largura_max), calculadas uma vez; fontes TTF
+são reduzidas ao subconjunto latino (tools/fontes.py).
+"""
+
+import base64
+import io
+import os
+import threading
+import time
+
+from . import fontes
+
+INTERVALO_VERIFICACAO = 10
+
+# (path, largura_max) -> (mtime ou None, monotonic da última verificação, data URI)
+_CACHE = {}
+_LOCK = threading.Lock()
+
+
+def _ler_data_uri(path, mime, largura_max):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if largura_max and mime == 'image/png':
+        data = _reduzir_png(data, largura_max)
+    elif mime == fontes.MIME_TTF:
+        data = fontes.subconjunto(data)
+    return 'data:%s;base64,%s' % (mime, base64.b64encode(data).decode('ascii'))
+
+
+def _reduzir_png(data, largura_max):
+    """Redimensiona a PNG para largura_max (mantendo a proporção) se ela for maior."""
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(data))
+    largura, altura = img.size
+    if largura <= largura_max:
+        return data
+    nova_altura = max(1, round(altura * largura_max / largura))
+    img = img.resize((largura_max, nova_altura), Image.LANCZOS)
+    out = io.BytesIO()
+    img.save(out, format='PNG', optimize=True)
+    return out.getvalue()
+
+
+def data_uri_arquivo(path, mime='image/png', largura_max=None):
+    """
+    Retorna o data URI do arquivo (ou '' se não existir), usando o cache do processo.
+    :param largura_max: se informado (PNG), usa variante com no máximo essa largura em px
+    """
+    chave = (path, largura_max)
+    agora = time.monotonic()
+    entrada = _CACHE.get(chave)
+    if entrada and agora - entrada[1] < INTERVALO_VERIFICACAO:
+        return entrada[2]
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        mtime = None
+    if entrada and entrada[0] == mtime:
+        uri = entrada[2]
+    elif mtime is None:
+        uri = ''
+    else:
+        try:
+            uri = _ler_data_uri(path, mime, largura_max)
+        except Exception:
+            uri = ''
+    with _LOCK:
+        _CACHE[chave] = (mtime, agora, uri)
+    return uri
+
+
+def limpar_cache():
+    with _LOCK:
+        _CACHE.clear()
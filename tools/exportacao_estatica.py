@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Arquivos da exportação estática das páginas de verificação (servidas pelo nginx, sem Odoo).
+Layout do diretório de exportação, com os tokens distribuídos por prefixo (2 caracteres):
+
+    verificar/<pp>/<token>.html   página de verificação pré-renderizada
+    verificar/<pp>/<token>.json   mesmos dados da API de verificação em lote
+    logo/<company_id>             logo reduzido da página (URL /certificados/logo/<id>)
+    manifest.json                 {"paginas": {token: etag}} da última exportação
+
+Exemplo de configuração do nginx (tokens ausentes seguem para o Odoo):
+
+    location ~ ^/(?:certificados/verificar|V)/(?<pp>[A-Za-z0-9]{2})(?<resto>[A-Za-z0-9]+)$ {
+        root /srv/certificados;
+        default_type text/html;
+        try_files /verificar/$pp/$pp$resto.html @odoo;
+    }
+    location ~ ^/certificados/verificar/(?<pp>[A-Za-z0-9]{2})(?<resto>[A-Za-z0-9]+)\\.json$ {
+        root /srv/certificados;
+        default_type application/json;
+        try_files /verificar/$pp/$pp$resto.json =404;
+    }
+    location ~ ^/certificados/logo/(?<empresa>[0-9]+)$ {
+        root /srv/certificados;
+        default_type image/png;
+        expires max;
+        try_files /logo/$empresa @odoo;
+    }
+
+Cada arquivo é gravado num temporário e renomeado (os.replace): o nginx nunca lê um arquivo pela metade.
+"""
+
+import json
+import os
+import re
+import tempfile
+
+MANIFESTO = 'manifest.json'
+VERSAO_MANIFESTO = 1
+# Tokens com outros caracteres não viram caminho no disco
+RE_TOKEN_ARQUIVO = re.compile(r'^[A-Za-z0-9]{3,64}$')
+
+
+def caminho_token(diretorio, token, extensao):
+    """Caminho do arquivo do token (None se o token não serve como nome de arquivo)."""
+    if not token or not RE_TOKEN_ARQUIVO.match(token):
+        return None
+    return os.path.join(diretorio, 'verificar', token[:2], '%s.%s' % (token, extensao))
+
+
+def gravar(caminho, data):
+    """Grava bytes de forma atômica, criando os diretórios que faltarem."""
+    pasta = os.path.dirname(caminho)
+    os.makedirs(pasta, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=pasta, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, caminho)
+    except Exception:
+        try:
+            os.unlink(temporario)
+        except OSError:
+            pass
+        raise
+
+
+def remover(caminho):
+    try:
+        os.unlink(caminho)
+    except FileNotFoundError:
+        pass
+
+
+def ler_manifesto(diretorio):
+    """{token: etag} da última exportação (vazio se não há manifesto ou ele é de outra versão)."""
+    try:
+        with open(os.path.join(diretorio, MANIFESTO), 'rb') as f:
+            manifesto = json.loads(f.read().decode('utf-8'))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifesto, dict) or manifesto.get('versao') != VERSAO_MANIFESTO:
+        return {}
+    return manifesto.get('paginas') or {}
+
+
+def gravar_manifesto(diretorio, paginas, **extras):
+    manifesto = dict(extras, versao=VERSAO_MANIFESTO, paginas=paginas)
+    gravar(
+        os.path.join(diretorio, MANIFESTO),
+        json.dumps(manifesto, sort_keys=True, separators=(',', ':')).encode('utf-8'),
+    )
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Filtro de pertinência dos tokens válidos, para rejeitar tokens inexistentes sem consultar o banco.
+Guarda um hash de 64 bits de cada token num array ordenado (8 bytes por token) e consulta por
+busca binária. Sem falso negativo; falso positivo (colisão de hash) só leva a uma busca normal no banco.
+Formatos de token (geracad_certificados.token_formato):
+  'uuid'   - uuid4 em hexadecimal, 32 caracteres minúsculos (padrão, tokens antigos)
+  'base32' - 16 caracteres base32 maiúsculos (80 bits), no alfabeto do modo alfanumérico do QR
+"""
+
+import base64
+import bisect
+import hashlib
+import re
+import secrets
+import uuid
+from array import array
+
+# uuid.uuid4().hex: 32 hex minúsculos, versão 4 e variante RFC 4122
+RE_TOKEN_UUID4 = re.compile(r'^[0-9a-f]{12}4[0-9a-f]{3}[89ab][0-9a-f]{15}$')
+# base32 (RFC 4648, sem padding) de 10 bytes aleatórios
+RE_TOKEN_BASE32 = re.compile(r'^[A-Z2-7]{16}$')
+BYTES_BASE32 = 10
+
+FORMATO_UUID = 'uuid'
+FORMATO_BASE32 = 'base32'
+FORMATOS = (FORMATO_UUID, FORMATO_BASE32)
+
+
+def formato_valido(token):
+    """True se o token tem o formato dos tokens gerados pelo módulo (qualquer dos formatos)."""
+    return isinstance(token, str) and bool(RE_TOKEN_UUID4.match(token) or RE_TOKEN_BASE32.match(token))
+
+
+def formato_do_token(token):
+    """'uuid', 'base32' ou None."""
+    if token and RE_TOKEN_BASE32.match(token):
+        return FORMATO_BASE32
+    if token and RE_TOKEN_UUID4.match(token):
+        return FORMATO_UUID
+    return None
+
+
+def gerar_token(formato=FORMATO_UUID):
+    """Token novo no formato pedido (sem conferir unicidade)."""
+    if formato == FORMATO_BASE32:
+        return base64.b32encode(secrets.token_bytes(BYTES_BASE32)).decode('ascii')
+    return uuid.uuid4().hex
+
+
+def _hash64(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class FiltroTokens(object):
+    """Conjunto compacto e imutável de tokens."""
+
+    def __init__(self, tokens):
+        self._hashes = array('Q', sorted(_hash64(t) for t in tokens if t))
+
+    def __contains__(self, token):
+        if not token:
+            return False
+        h = _hash64(token)
+        i = bisect.bisect_left(self._hashes, h)
+        return i < len(self._hashes) and self._hashes[i] == h
+
+    def __len__(self):
+        return len(self._hashes)
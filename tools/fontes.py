@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Fonte do certificado embutida no HTML (@font-face com data URI), em vez do link para o
+Google Fonts: o wkhtmltopdf não faz requisição de rede e o resultado não depende dela.
+Os TTF (instâncias estáticas da Libre Baskerville, licença SIL OFL 1.1 em static/fonts/OFL.txt)
+ficam em static/fonts/; ao ler, são reduzidos ao subconjunto latino usado em português
+(fontTools, se instalado), e o data URI fica no cache de tools/estaticos.py.
+No PDF o CSS vai uma vez por execução do wkhtmltopdf (--user-style-sheet, ver arquivo_css), e não
+em cada article: o Odoo grava cada aluno num HTML separado e o CSS se repetiria por aluno.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import tempfile
+
+_logger = logging.getLogger(__name__)
+
+FAMILIA = 'Libre Baskerville'
+# (arquivo em static/fonts, font-weight, font-style)
+VARIANTES = (
+    ('LibreBaskerville-Regular.ttf', 400, 'normal'),
+    ('LibreBaskerville-Bold.ttf', 700, 'normal'),
+    ('LibreBaskerville-Italic.ttf', 400, 'italic'),
+)
+MIME_TTF = 'font/ttf'
+
+# ASCII, Latin-1 (acentos do português) e pontuação tipográfica comum
+UNICODES_LATIN = (
+    list(range(0x20, 0x7f))
+    + list(range(0xa0, 0x100))
+    + [0x2013, 0x2014, 0x2018, 0x2019, 0x201c, 0x201d, 0x2022, 0x2026, 0x20ac]
+)
+
+
+def subconjunto(data, unicodes=UNICODES_LATIN):
+    """TTF só com os glifos de `unicodes` (sem hinting); devolve `data` se fontTools não estiver disponível."""
+    try:
+        from fontTools import subset
+        from fontTools.ttLib import TTFont
+    except ImportError:
+        return data
+    try:
+        fonte = TTFont(io.BytesIO(data))
+        opcoes = subset.Options()
+        opcoes.hinting = False
+        opcoes.layout_features = ['kern', 'liga']
+        subsetter = subset.Subsetter(options=opcoes)
+        subsetter.populate(unicodes=unicodes)
+        subsetter.subset(fonte)
+        out = io.BytesIO()
+        fonte.save(out)
+        return out.getvalue()
+    except Exception:
+        _logger.warning('Não foi possível reduzir a fonte; usando o arquivo completo.', exc_info=True)
+        return data
+
+
+def css_font_face(familia, variantes):
+    """
+    Regras @font-face para as variantes disponíveis.
+    :param variantes: lista de (data URI, font-weight, font-style); URIs vazios são ignorados
+    """
+    regras = [
+        "@font-face { font-family: '%s'; font-weight: %s; font-style: %s; "
+        "src: url(%s) format('truetype'); }" % (familia, peso, estilo, uri)
+        for uri, peso, estilo in variantes if uri
+    ]
+    return '\n'.join(regras)
+
+
+def arquivo_css(css, diretorio=None):
+    """
+    Caminho de um arquivo .css com `css` (para o --user-style-sheet do wkhtmltopdf). O nome vem do
+    hash do conteúdo: o arquivo é gravado uma vez (troca atômica) e reaproveitado pelos workers.
+    """
+    diretorio = diretorio or tempfile.gettempdir()
+    caminho = os.path.join(diretorio, 'geracad_fontes_%s.css' % hashlib.sha1(css.encode('utf-8')).hexdigest())
+    if not os.path.exists(caminho):
+        fd, temporario = tempfile.mkstemp(prefix='geracad_fontes_', suffix='.tmp', dir=diretorio)
+        with os.fdopen(fd, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(css)
+        os.replace(temporario, caminho)
+    return caminho
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Processamento de imagens das assinaturas (remoção de fundo claro) e variantes reduzidas.
+A máscara é calculada por aritmética de bandas do PIL (ImageMath), em C,
+sem iterar pixel a pixel em Python.
+As variantes (variante_png) têm ~2x o tamanho em que a imagem é exibida (nitidez na impressão)
+e paleta de cores reduzida, em vez da imagem original embutida em resolução total.
+"""
+
+import io
+
+SOMA_LIMITE_PADRAO = 700
+
+# Cor gravada nos pixels de fundo (mesma da implementação original com putdata)
+COR_TRANSPARENTE = (255, 255, 255, 0)
+
+# Caixas (largura, altura) máximas das variantes, em px: ~2x o tamanho exibido (CSS px)
+ASSINATURA_MAX = (480, 220)         # certificado: max-height 110px
+LOGO_CERTIFICADO_MAX = (480, 240)   # certificado: max 240x120
+LOGO_VERIFICACAO_MAX = (640, 160)   # página de verificação: max-height 80px
+SELO_LARGURA_MAX = 240              # certificado: 120x150
+CORES_ASSINATURA = 64
+CORES_LOGO = 256
+# Entra na impressão digital do certificado: mudar as caixas/cores regera os PDFs guardados
+VERSAO_VARIANTES = '%sx%s-%s|%sx%s-%s' % (ASSINATURA_MAX + (CORES_ASSINATURA,) + LOGO_CERTIFICADO_MAX + (CORES_LOGO,))
+
+CABECALHO_PNG = b'\x89PNG\r\n\x1a\n'
+
+
+def _mascara_fundo(img, soma_limite):
+    """
+    Retorna máscara modo 'L' com 255 onde R+G+B > soma_limite e 0 nos demais pixels.
+    A soma é feita em modo 'I' (32 bits), então não há saturação em 255.
+    """
+    from PIL import ImageMath
+
+    r, g, b = img.split()[:3]
+    if hasattr(ImageMath, 'lambda_eval'):
+        # Pillow >= 10.3 (ImageMath.eval está obsoleto)
+        return ImageMath.lambda_eval(
+            lambda a: a['convert'](((a['r'] + a['g'] + a['b']) > soma_limite) * 255, 'L'),
+            r=r, g=g, b=b,
+        )
+    return ImageMath.eval(
+        "convert(((r + g + b) > limite) * 255, 'L')",
+        r=r, g=g, b=b, limite=soma_limite,
+    )
+
+
+def remover_fundo_claro(raw, soma_limite=SOMA_LIMITE_PADRAO):
+    """
+    Pixels com soma R+G+B > soma_limite viram transparentes; demais são mantidos.
+    :param raw: bytes da imagem (PNG, JPEG ou JPG)
+    :return: bytes da PNG resultante
+    """
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(raw)).convert('RGBA')
+    img.paste(COR_TRANSPARENTE, mask=_mascara_fundo(img, soma_limite))
+    out = io.BytesIO()
+    img.save(out, format='PNG')
+    return out.getvalue()
+
+
+def _quantizar(img, cores):
+    """Reduz a imagem a `cores` cores (paleta); mantém RGBA se o Pillow não gerar paleta com alfa."""
+    from PIL import Image
+
+    metodo = Image.Quantize.FASTOCTREE if hasattr(Image, 'Quantize') else 2
+    paleta = img.quantize(colors=cores, method=metodo)
+    if img.mode == 'RGBA' and paleta.palette.mode != 'RGBA':
+        return img
+    return paleta
+
+
+def variante_png(raw, largura_max, altura_max, cores=CORES_LOGO):
+    """
+    PNG reduzida para caber em largura_max x altura_max (sem ampliar) e com paleta de `cores` cores.
+    Se a imagem já cabe na caixa e a original (PNG) é menor que a variante, devolve a original.
+    :param raw: bytes da imagem (PNG, JPEG ou JPG)
+    :return: bytes da PNG
+    """
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(raw))
+    com_alfa = img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+    img = img.convert('RGBA' if com_alfa else 'RGB')
+    largura, altura = img.size
+    escala = min(1.0, largura_max / float(largura), altura_max / float(altura))
+    if escala < 1.0:
+        tamanho = (max(1, round(largura * escala)), max(1, round(altura * escala)))
+        img = img.resize(tamanho, Image.LANCZOS)
+    if cores:
+        img = _quantizar(img, cores)
+    out = io.BytesIO()
+    img.save(out, format='PNG', optimize=True)
+    png = out.getvalue()
+    if escala >= 1.0 and raw[:8] == CABECALHO_PNG and len(raw) <= len(png):
+        return raw
+    return png
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentação opcional dos pontos quentes (relatórios e rotas de verificação).
+Uma operação (ex.: impressão do certificado) abre uma Medicao na thread atual; o código
+chamado registra etapas com `with etapa('nome') as e: ...; e.bytes = len(...)` ou com o
+decorador @medir_etapa('nome') (bytes = tamanho do retorno, se for str/bytes).
+Sem medição ativa, etapa() devolve um objeto nulo compartilhado: o custo é uma leitura
+de threading.local. Etapas podem se aninhar (a duração da externa inclui a interna) e se
+repetir (contam chamadas, somam duração e bytes e guardam a maior duração de uma chamada).
+Ao encerrar, a medição vira uma linha de log em JSON e é somada aos contadores do processo.
+"""
+
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+_logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_lock = threading.Lock()
+# (operacao, etapa) -> [chamadas, segundos, maior duração, bytes]; etapa 'total' = operação inteira
+_CONTADORES = {}
+
+
+class _EtapaNula(object):
+    """Etapa sem medição ativa: ignora tudo."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, nome, valor):
+        pass
+
+
+_ETAPA_NULA = _EtapaNula()
+
+
+class _Etapa(object):
+
+    __slots__ = ('medicao', 'nome', 'bytes', '_inicio')
+
+    def __init__(self, medicao, nome):
+        self.medicao = medicao
+        self.nome = nome
+        self.bytes = 0
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.medicao.registrar(self.nome, time.perf_counter() - self._inicio, self.bytes)
+        return False
+
+
+class Medicao(object):
+    """Durações e tamanhos das etapas de uma operação."""
+
+    def __init__(self, operacao, **atributos):
+        self.operacao = operacao
+        self.atributos = atributos
+        self.etapas = {}
+        self.duracao = 0.0
+        self._inicio = time.perf_counter()
+
+    def etapa(self, nome):
+        return _Etapa(self, nome)
+
+    def registrar(self, nome, duracao, tamanho=0):
+        # [chamadas, segundos, bytes, maior duração de uma chamada]
+        dados = self.etapas.setdefault(nome, [0, 0.0, 0, 0.0])
+        dados[0] += 1
+        dados[1] += duracao
+        dados[2] += tamanho or 0
+        dados[3] = max(dados[3], duracao)
+
+    def anotar(self, **atributos):
+        self.atributos.update(atributos)
+
+    def encerrar(self):
+        self.duracao = time.perf_counter() - self._inicio
+        with _lock:
+            _somar((self.operacao, 'total'), 1, self.duracao, self.atributos.get('bytes') or 0, self.duracao)
+            for nome, (chamadas, duracao, tamanho, maior) in self.etapas.items():
+                _somar((self.operacao, nome), chamadas, duracao, tamanho, maior)
+        _logger.info('geracad_metrica %s', json.dumps(self.to_dict(), sort_keys=True, default=str))
+
+    def to_dict(self):
+        dados = dict(self.atributos)
+        dados.update({
+            'operacao': self.operacao,
+            'total_ms': round(self.duracao * 1000, 3),
+            'etapas': {
+                nome: {
+                    'chamadas': chamadas,
+                    'ms': round(duracao * 1000, 3),
+                    'max_ms': round(maior * 1000, 3),
+                    'bytes': tamanho,
+                }
+                for nome, (chamadas, duracao, tamanho, maior) in self.etapas.items()
+            },
+        })
+        return dados
+
+
+def _somar(chave, chamadas, duracao, tamanho, maior):
+    dados = _CONTADORES.get(chave)
+    if dados is None:
+        dados = _CONTADORES[chave] = [0, 0.0, 0.0, 0]
+    dados[0] += chamadas
+    dados[1] += duracao
+    dados[2] = max(dados[2], maior)
+    dados[3] += tamanho
+
+
+def atual():
+    """Medição ativa na thread atual (ou None)."""
+    return getattr(_local, 'medicao', None)
+
+
+def etapa(nome):
+    """Context manager da etapa na medição ativa; nulo se não houver medição."""
+    medicao = getattr(_local, 'medicao', None)
+    if medicao is None:
+        return _ETAPA_NULA
+    return medicao.etapa(nome)
+
+
+def medir_etapa(nome):
+    """Decorador: mede cada chamada da função como etapa da medição ativa."""
+    def decorador(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            medicao = getattr(_local, 'medicao', None)
+            if medicao is None:
+                return func(*args, **kwargs)
+            inicio = time.perf_counter()
+            resultado = func(*args, **kwargs)
+            tamanho = len(resultado) if isinstance(resultado, (str, bytes)) else 0
+            medicao.registrar(nome, time.perf_counter() - inicio, tamanho)
+            return resultado
+        return wrapper
+    return decorador
+
+
+@contextmanager
+def operacao(nome, **atributos):
+    """
+    Abre uma medição na thread atual. Dentro de outra medição, vira uma etapa dela
+    (ex.: verso renderizado dentro do certificado) e devolve a medição externa.
+    """
+    externa = atual()
+    if externa is not None:
+        with externa.etapa(nome):
+            yield externa
+        return
+    medicao = _local.medicao = Medicao(nome, **atributos)
+    try:
+        yield medicao
+    finally:
+        _local.medicao = None
+        medicao.encerrar()
+
+
+def contadores():
+    """Cópia dos contadores do processo: lista de dicts por (operação, etapa)."""
+    with _lock:
+        itens = sorted(_CONTADORES.items())
+    return [{
+        'operacao': operacao_,
+        'etapa': etapa_,
+        'chamadas': chamadas,
+        'total_ms': round(duracao * 1000, 3),
+        'media_ms': round(duracao * 1000 / chamadas, 3) if chamadas else 0.0,
+        'max_ms': round(maior * 1000, 3),
+        'bytes': tamanho,
+    } for (operacao_, etapa_), (chamadas, duracao, maior, tamanho) in itens]
+
+
+def zerar_contadores():
+    with _lock:
+        _CONTADORES.clear()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Lista de entrega de certificados em formato tabular (CSV/XLSX) e paginação do PDF.
+As linhas chegam prontas (tuplas, ver geracad.certificados.curso._get_lista_entrega_linhas);
+aqui só há serialização, sem ORM.
+CSV: UTF-8 com BOM e ';' como separador (abre direto no Excel em pt-BR), gerado linha a linha.
+XLSX: xlsxwriter em modo constant_memory (cada linha vai para o disco ao ser escrita).
+"""
+
+import csv
+import io
+
+CABECALHO = ('Curso', 'Período', 'Nº', 'Nome do aluno', 'Categoria', 'Registro Nº', 'RENACH', 'Token')
+LARGURAS_XLSX = (40, 24, 6, 40, 12, 16, 16, 34)
+LINHAS_POR_PAGINA_PADRAO = 25
+
+
+def csv_blocos(linhas, linhas_por_bloco=500):
+    """Gera o CSV em blocos de bytes (para resposta em streaming)."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, delimiter=';', lineterminator='\r\n')
+    buffer.write('\ufeff')
+    escritor.writerow(CABECALHO)
+    for i, linha in enumerate(linhas, 1):
+        escritor.writerow(linha)
+        if i % linhas_por_bloco == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def gravar_xlsx(arquivo, linhas, titulo='Lista de entrega'):
+    """Grava a planilha em `arquivo` (caminho ou arquivo binário aberto)."""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(arquivo, {'constant_memory': True})
+    try:
+        planilha = workbook.add_worksheet(titulo[:31])
+        negrito = workbook.add_format({'bold': True, 'bg_color': '#F0F0F0', 'border': 1})
+        for coluna, largura in enumerate(LARGURAS_XLSX):
+            planilha.set_column(coluna, coluna, largura)
+        planilha.write_row(0, 0, CABECALHO, negrito)
+        planilha.freeze_panes(1, 0)
+        for i, linha in enumerate(linhas, 1):
+            planilha.write_row(i, 0, linha)
+    finally:
+        workbook.close()
+
+
+def paginar(linhas, linhas_por_pagina=LINHAS_POR_PAGINA_PADRAO):
+    """Divide as linhas de um curso em páginas de tamanho fixo (ao menos uma página, mesmo sem linhas)."""
+    linhas_por_pagina = max(1, int(linhas_por_pagina or LINHAS_POR_PAGINA_PADRAO))
+    paginas = [linhas[i:i + linhas_por_pagina] for i in range(0, len(linhas), linhas_por_pagina)]
+    return paginas or [[]]
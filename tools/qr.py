@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Geração do QR code de verificação no tamanho em que é impresso.
+O slot do certificado tem 70 px; a imagem é gerada com ~2x isso (impressão) e borda mínima,
+em PNG de 1 bit, em vez do tamanho padrão do qrcode.make (box 10, borda 4).
+"""
+
+import io
+
+TAMANHO_PX = 140
+BORDA = 2
+
+
+def _montar(url):
+    import qrcode
+
+    qr = qrcode.QRCode(
+        error_correction=qrcode.constants.ERROR_CORRECT_M,
+        box_size=1,
+        border=BORDA,
+    )
+    qr.add_data(url)
+    qr.make(fit=True)
+    qr.box_size = max(1, int(round(TAMANHO_PX / float(qr.modules_count + 2 * BORDA))))
+    return qr
+
+
+def gerar_qrcode_png(url):
+    """Bytes da PNG (1 bit) do QR code para a URL."""
+    img = _montar(url).make_image()
+    out = io.BytesIO()
+    img.save(out, format='PNG', optimize=True)
+    return out.getvalue()
+
+
+def gerar_qrcode_svg(url):
+    """Bytes do SVG (um único path) do QR code para a URL."""
+    from qrcode.image.svg import SvgPathImage
+
+    img = _montar(url).make_image(image_factory=SvgPathImage)
+    out = io.BytesIO()
+    img.save(out)
+    return out.getvalue()
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Assistente de importação de alunos (CSV ou XLSX) para um curso de certificação.
+Colunas reconhecidas pelo cabeçalho: nome, categoria, registro e RENACH (só o nome é obrigatório).
+As linhas são lidas uma a uma (csv.reader / openpyxl read_only / xlrd para .xls), validadas, deduplicadas
+(no arquivo e contra os alunos já cadastrados no curso) e inseridas em blocos pelo create em lote.
+"""
+
+import base64
+import csv
+import io
+import unicodedata
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+
+TAMANHO_BLOCO = 1000
+# Quantidade máxima de erros listados no resultado (os demais só entram na contagem)
+MAX_ERROS_LISTADOS = 200
+# Início dos arquivos OLE2 (formato binário .xls do Excel 97-2003)
+ASSINATURA_OLE2 = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+# Cabeçalho normalizado -> campo de geracad.certificados.curso.aluno
+COLUNAS = {
+    'nome': 'nome_aluno',
+    'nome do aluno': 'nome_aluno',
+    'nome_aluno': 'nome_aluno',
+    'aluno': 'nome_aluno',
+    'name': 'nome_aluno',
+    'categoria': 'aluno_categoria',
+    'cat': 'aluno_categoria',
+    'aluno_categoria': 'aluno_categoria',
+    'registro': 'aluno_registro',
+    'registro no': 'aluno_registro',
+    'registro n': 'aluno_registro',
+    'aluno_registro': 'aluno_registro',
+    'renach': 'aluno_renach',
+    'aluno_renach': 'aluno_renach',
+}
+
+
+def _normalizar(texto):
+    """Minúsculas, sem acentos, pontuação ou espaços extras (cabeçalhos e chave de deduplicação)."""
+    texto = unicodedata.normalize('NFKD', str(texto or '')).encode('ascii', 'ignore').decode('ascii')
+    texto = ''.join(c if c.isalnum() or c in ' _' else ' ' for c in texto.lower())
+    return ' '.join(texto.split())
+
+
+def _celula(valor):
+    """Texto da célula; números inteiros do Excel (ex.: registro) sem o '.0'."""
+    if valor is None:
+        return ''
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip()
+
+
+class GeracadCertificadosImportarAlunos(models.TransientModel):
+    _name = 'geracad.certificados.importar.alunos'
+    _description = 'Importar alunos (CSV/XLSX) para o curso de certificação'
+
+    curso_id = fields.Many2one(
+        'geracad.certificados.curso',
+        string='Curso',
+        required=True,
+        ondelete='cascade',
+    )
+    arquivo = fields.Binary(string='Arquivo (CSV ou XLSX)', required=True)
+    arquivo_nome = fields.Char(string='Nome do arquivo')
+    state = fields.Selection(
+        [('inicio', 'Início'), ('concluido', 'Concluído')],
+        default='inicio',
+    )
+    qtd_importados = fields.Integer(string='Importados', readonly=True)
+    qtd_duplicados = fields.Integer(string='Duplicados (ignorados)', readonly=True)
+    qtd_erros = fields.Integer(string='Linhas com erro', readonly=True)
+    resultado = fields.Text(string='Erros por linha', readonly=True)
+
+    def _linhas_csv(self, raw):
+        """
+        Itera as linhas do CSV (separador ; , ou tab detectado). O arquivo inteiro é decodificado
+        de uma vez, como UTF-8 ou, se não for válido, Latin-1: um acento no fim do arquivo
+        não pode mais quebrar a leitura no meio da importação.
+        """
+        try:
+            texto = raw.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            texto = raw.decode('latin-1')
+        try:
+            dialect = csv.Sniffer().sniff(texto[:4096], delimiters=';,\t')
+        except csv.Error:
+            dialect = csv.excel
+        return csv.reader(io.StringIO(texto, newline=''), dialect)
+
+    def _linhas_xlsx(self, raw):
+        """Itera as linhas da primeira planilha em modo somente leitura (openpyxl) ou, na falta dele, xlrd."""
+        try:
+            import openpyxl
+        except ImportError:
+            openpyxl = None
+        if openpyxl:
+            wb = openpyxl.load_workbook(io.BytesIO(raw), read_only=True, data_only=True)
+            return wb.worksheets[0].iter_rows(values_only=True)
+        return self._linhas_xls(raw)
+
+    def _linhas_xls(self, raw):
+        """Itera as linhas da primeira planilha com xlrd (único leitor do formato binário .xls)."""
+        import xlrd
+        sheet = xlrd.open_workbook(file_contents=raw).sheet_by_index(0)
+        return (sheet.row_values(i) for i in range(sheet.nrows))
+
+    def _linhas_arquivo(self):
+        """Escolhe o leitor pelo conteúdo: XLSX (zip, 'PK'), XLS (OLE2) ou CSV."""
+        raw = base64.b64decode(self.arquivo)
+        nome = (self.arquivo_nome or '').lower()
+        if raw[:2] == b'PK':
+            return self._linhas_xlsx(raw)
+        if raw[:8] == ASSINATURA_OLE2 or nome.endswith('.xls'):
+            return self._linhas_xls(raw)
+        if nome.endswith(('.xlsx', '.xlsm')):
+            raise UserError(_('O arquivo %s não é uma planilha XLSX válida.') % self.arquivo_nome)
+        return self._linhas_csv(raw)
+
+    def _mapear_cabecalho(self, cabecalho):
+        """Índice da coluna -> campo; exige a coluna do nome."""
+        mapa = {}
+        for i, titulo in enumerate(cabecalho):
+            campo = COLUNAS.get(_normalizar(titulo))
+            if campo and campo not in mapa.values():
+                mapa[i] = campo
+        if 'nome_aluno' not in mapa.values():
+            raise UserError(_(
+                'Cabeçalho sem a coluna do nome do aluno. Colunas esperadas: nome, categoria, registro, RENACH.'
+            ))
+        return mapa
+
+    @api.model
+    def _chave_duplicidade(self, vals):
+        return (_normalizar(vals.get('nome_aluno')), _normalizar(vals.get('aluno_registro')))
+
+    def action_importar(self):
+        """Lê o arquivo linha a linha e cria os alunos em blocos de TAMANHO_BLOCO."""
+        self.ensure_one()
+        Aluno = self.env['geracad.certificados.curso.aluno'].with_context(geracad_qrcode_adiado=True)
+        existentes = {
+            self._chave_duplicidade(vals)
+            for vals in Aluno.search_read([('curso_id', '=', self.curso_id.id)], ['nome_aluno', 'aluno_registro'])
+        }
+        linhas = iter(self._linhas_arquivo())
+        cabecalho = next(linhas, None)
+        if not cabecalho:
+            raise UserError(_('O arquivo está vazio.'))
+        mapa = self._mapear_cabecalho(cabecalho)
+
+        importados = duplicados = qtd_erros = 0
+        erros = []
+        bloco = []
+        for numero, linha in enumerate(linhas, start=2):
+            if not linha or not any(_celula(v) for v in linha):
+                continue
+            vals = {'curso_id': self.curso_id.id}
+            for i, campo in mapa.items():
+                vals[campo] = _celula(linha[i]) if i < len(linha) else ''
+            if not vals['nome_aluno']:
+                qtd_erros += 1
+                if len(erros) < MAX_ERROS_LISTADOS:
+                    erros.append(_('Linha %s: nome do aluno vazio.') % numero)
+                continue
+            chave = self._chave_duplicidade(vals)
+            if chave in existentes:
+                duplicados += 1
+                if len(erros) < MAX_ERROS_LISTADOS:
+                    erros.append(_('Linha %s: "%s" já cadastrado no curso ou repetido no arquivo (ignorado).')
+                                 % (numero, vals['nome_aluno']))
+                continue
+            existentes.add(chave)
+            bloco.append(vals)
+            if len(bloco) >= TAMANHO_BLOCO:
+                Aluno.create(bloco)
+                importados += len(bloco)
+                bloco = []
+        if bloco:
+            Aluno.create(bloco)
+            importados += len(bloco)
+
+        if qtd_erros + duplicados > len(erros):
+            erros.append(_('... e mais %s linhas.') % (qtd_erros + duplicados - len(erros)))
+        self.write({
+            'state': 'concluido',
+            'qtd_importados': importados,
+            'qtd_duplicados': duplicados,
+            'qtd_erros': qtd_erros,
+            'resultado': '\n'.join(erros),
+            'arquivo': False,
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }